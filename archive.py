@@ -0,0 +1,122 @@
+"""Append-only compressed archive of fetched pages, keyed by URL"""
+import os
+import time
+import zlib
+import sqlite3
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; fall back to zlib segments
+    zstandard = None
+
+SEGMENT_SIZE = 256 * 1024 * 1024
+ZSTD_LEVEL = 3
+INDEX_NAME = 'index.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    fetched REAL NOT NULL
+);
+"""
+
+class PageArchive:
+    """Raw page bodies stored as independently compressed records in segment files
+
+    Segments are only ever appended to. Each writer opens its own segment
+    files (named by start time and pid), so several crawler processes can
+    share one archive directory; the SQLite index maps every URL to the
+    latest record stored for it. Every index write is committed at once,
+    so no process holds the index's write lock between pages.
+    """
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, INDEX_NAME), timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.extension = '.zst' if zstandard else '.zlib'
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard else None
+        self.decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        self.writer = None
+        self.writer_name = None
+        self.writer_prefix = f'{int(time.time())}-{os.getpid()}'
+        self.writer_count = 0
+        self.readers = {}
+
+    def _compress(self, body):
+        if self.compressor is not None:
+            return self.compressor.compress(body)
+        return zlib.compress(body, 6)
+
+    def _decompress(self, segment, data):
+        if segment.endswith('.zst'):
+            if self.decompressor is None:
+                raise RuntimeError(f'{segment} is zstd-compressed; install zstandard to read it')
+            return self.decompressor.decompress(data)
+        return zlib.decompress(data)
+
+    def _open_segment(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.writer_name = f'segment-{self.writer_prefix}-{self.writer_count:05d}{self.extension}'
+        self.writer_count += 1
+        self.writer = open(os.path.join(self.directory, self.writer_name), 'ab')
+
+    def put(self, url, body):
+        """Append a page body and point the index at it"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if self.writer is None or self.writer.tell() >= self.segment_size:
+            self._open_segment()
+        record = self._compress(body)
+        offset = self.writer.tell()
+        self.writer.write(record)
+        # Readers in other processes must find the record the index points at
+        self.writer.flush()
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, segment, offset, length, fetched) VALUES (?, ?, ?, ?, ?)',
+                (url, self.writer_name, offset, len(record), time.time())
+            )
+
+    def get(self, url):
+        """Latest stored body for url, or None if it was never archived"""
+        row = self.conn.execute('SELECT segment, offset, length FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        segment, offset, length = row
+        reader = self.readers.get(segment)
+        if reader is None:
+            reader = self.readers[segment] = open(os.path.join(self.directory, segment), 'rb')
+        reader.seek(offset)
+        return self._decompress(segment, reader.read(length))
+
+    def __contains__(self, url):
+        return self.conn.execute('SELECT 1 FROM pages WHERE url = ?', (url,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def flush(self):
+        """Make every stored record durable"""
+        if self.writer is not None:
+            self.writer.flush()
+            os.fsync(self.writer.fileno())
+        self.conn.commit()
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        for reader in self.readers.values():
+            reader.close()
+        self.readers.clear()
+        self.conn.close()
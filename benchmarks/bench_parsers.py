@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the crawler's parsing hot paths over frozen HTML fixtures
+
+Reports pages/s, per-page latency percentiles and peak Python-heap memory
+for each parser and backend. tracemalloc does not see lxml's C allocations,
+so the process max RSS is printed at the end as well. Backends for the same
+function must return identical results on every fixture before they are timed.
+
+Usage:
+    python benchmarks/bench_parsers.py [--rounds N] [--only SUBSTRING]
+    python benchmarks/bench_parsers.py --save baseline.json
+    python benchmarks/bench_parsers.py --compare baseline.json   # exit 1 on regression
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cwr import ArticleExtractor, CivilicaScraper
+from citations import citation_fields
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+REGRESSION_TOLERANCE = 1.5      # --compare fails when p50 grows by more than this factor
+
+def bs4_parse_article_page(html):
+    """Reference BeautifulSoup parser: one lxml soup plus an html.parser soup for keywords"""
+    soup = BeautifulSoup(html, 'lxml')
+    abstract_div = soup.select_one('div.prose.max-w-none.my-6.text-color-black.text-justify > div')
+    abstract = abstract_div.text.strip() if abstract_div else ''
+    citation_block = soup.select_one('blockquote.container.mx-auto.mb-8')
+    citation = citation_block.find('p').text.strip() if citation_block else ''
+    authors_map = {}
+    for block in soup.select('div.my-2.flex.flex-row.items-center'):
+        name_tag = block.select_one('div.flex.flex-col > a')
+        place_tag = block.select_one('div.flex.flex-col > p')
+        if name_tag:
+            authors_map[name_tag.text.strip()] = place_tag.text.strip() if place_tag else ''
+    view_count = '0'
+    view_tag = soup.find('span', class_='text-color-muted')
+    if view_tag:
+        match = re.search(r'(\d+)', view_tag.text.strip())
+        if match:
+            view_count = match.group(1)
+    cited = citation_fields(citation)
+    return {
+        'abstract': abstract, 'citation': citation, 'authors': ', '.join(authors_map.keys()),
+        'conference': cited['conference'], 'year': cited['year'],
+        'keywords': bs4_extract_keywords(html) or '', 'view_count': view_count,
+        'page_count': cited['page_count'], 'authors_map': authors_map
+    }
+
+def bs4_extract_keywords(html):
+    """Reference keyword extraction: html.parser soup and a Python class matcher"""
+    soup = BeautifulSoup(html, 'html.parser')
+    container = soup.find('div', class_=lambda x: x and 'text-color-base' in x and 'pt-2' in x and 'p-4' in x and 'my-4' in x and 'bg-white' in x and 'border' in x and 'rounded' in x)
+    if not container:
+        return None
+    keywords = [d.get_text(strip=True) for d in container.select('div') if d.get_text(strip=True)]
+    return ', '.join(keywords) if keywords else None
+
+_list_items = etree.XPath("//ul[@id='articleLists']//li")
+_list_link = etree.XPath("(.//h2)[1]/descendant::a[1]")
+_list_parser = lxml_html.HTMLParser(encoding='utf-8')
+
+def lxml_parse_article_list(html, conference_id):
+    """Candidate lxml backend for CivilicaScraper.parse_article_list"""
+    try:
+        tree = lxml_html.document_fromstring(html, parser=_list_parser)
+    except etree.ParserError:
+        return []
+    articles = []
+    for li in _list_items(tree):
+        links = _list_link(li)
+        if links and links[0].get('href'):
+            title = re.sub(r'^\d+\.\s*', '', links[0].text_content().strip())
+            articles.append((conference_id, title, urljoin('https://civilica.com/', links[0].get('href'))))
+    return articles
+
+def load_fixtures(prefix):
+    fixtures = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith(prefix) and name.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+                fixtures[name] = f.read()
+    return fixtures
+
+def load_citations():
+    with open(os.path.join(FIXTURES_DIR, 'citations.txt'), encoding='utf-8') as f:
+        return {f'citations.txt:{i + 1}': line.strip() for i, line in enumerate(f) if line.strip()}
+
+def build_cases():
+    """{parser name: (inputs, {backend: func})}; every func takes one input"""
+    extractor = ArticleExtractor()
+    scraper = CivilicaScraper.__new__(CivilicaScraper)
+    scraper.extractor = extractor
+    lists = load_fixtures('list_')
+    articles = load_fixtures('article_')
+    return {
+        'parse_article_list': (lists, {
+            'bs4': lambda page: CivilicaScraper.parse_article_list(page, '140848'),
+            'lxml': lambda page: lxml_parse_article_list(page, '140848'),
+        }),
+        'parse_article_page': (articles, {
+            'bs4': lambda page: bs4_parse_article_page(page.decode('utf-8')),
+            'lxml': scraper.parse_article_page,
+        }),
+        'extract_keywords_from_page': (articles, {
+            'bs4': lambda page: bs4_extract_keywords(page.decode('utf-8')),
+            'lxml': scraper.extract_keywords_from_page,
+        }),
+        'parse_citation_details': (load_citations(), {
+            'regex': citation_fields,
+        }),
+    }
+
+def check_agreement(name, inputs, backends):
+    """Every backend must give the same answer as the first one on every input"""
+    reference_name, reference = next(iter(backends.items()))
+    for fixture, data in inputs.items():
+        expected = reference(data)
+        for backend, func in backends.items():
+            if func(data) != expected:
+                sys.exit(f'{name}: backend {backend} disagrees with {reference_name} on {fixture}')
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(func, inputs, rounds):
+    """Latency percentiles (ms), throughput and peak Python-heap memory (KiB) for func"""
+    data = list(inputs.values())
+    timings = []
+    for _ in range(rounds):
+        for item in data:
+            started = time.perf_counter()
+            func(item)
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    # Peak memory is traced separately so tracing does not skew the timings
+    tracemalloc.start()
+    for item in data:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages_per_s': len(timings) / sum(timings),
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p90_ms': percentile(timings, 0.90) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'peak_kib': peak / 1024,
+    }
+
+def compare(results, baseline_path):
+    """Print regressions against a saved run; return True if any were found"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressed = False
+    for key, stats in results.items():
+        old = baseline.get(key)
+        if old and stats['p50_ms'] > old['p50_ms'] * REGRESSION_TOLERANCE:
+            print(f'REGRESSION {key}: p50 {old["p50_ms"]:.3f} -> {stats["p50_ms"]:.3f} ms')
+            regressed = True
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Civilica parsers on frozen fixtures')
+    parser.add_argument('--rounds', type=int, default=20, help='Passes over each fixture set (default: 20)')
+    parser.add_argument('--only', type=str, default='', help='Only run parsers whose name contains this')
+    parser.add_argument('--save', type=str, help='Write results as JSON for a later --compare')
+    parser.add_argument('--compare', type=str, help='Fail if p50 regressed against this saved JSON')
+    args = parser.parse_args()
+
+    results = {}
+    print(f'{"parser":28} {"backend":8} {"pages/s":>9} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"heap KiB":>9}')
+    for name, (inputs, backends) in build_cases().items():
+        if args.only not in name:
+            continue
+        check_agreement(name, inputs, backends)
+        for backend, func in backends.items():
+            stats = measure(func, inputs, args.rounds)
+            results[f'{name}/{backend}'] = stats
+            print(f'{name:28} {backend:8} {stats["pages_per_s"]:9.1f} {stats["p50_ms"]:8.3f} '
+                  f'{stats["p90_ms"]:8.3f} {stats["p99_ms"]:8.3f} {stats["peak_kib"]:9.1f}')
+        if len(backends) > 1:
+            fastest = min(backends, key=lambda b: results[f'{name}/{b}']['p50_ms'])
+            slowest = max(backends, key=lambda b: results[f'{name}/{b}']['p50_ms'])
+            ratio = results[f'{name}/{slowest}']['p50_ms'] / results[f'{name}/{fastest}']['p50_ms']
+            print(f'{"":28} {fastest} is {ratio:.1f}x faster than {slowest}')
+
+    if resource is not None:
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f'process max RSS: {max_rss / 1024 if sys.platform != "darwin" else max_rss / 1024 ** 2:.1f} MiB')
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
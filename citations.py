@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Fields mined from an article's citation text, and a backfill for existing output CSVs
+
+Article pages carry one of two citation texts. The descriptive sentence
+("مقاله ... نوشته شده توسط ... پذیرفته شده است ...") names the conference,
+year, keywords, view count and page count. The reference line in the
+page's citation blockquote ("در صورتی که ... ارجاع دهید ...: authors،
+title، conference، city، year، URL") only ends in the conference, city and
+year; Page_Count stays blank for those pages. The crawlers fill rows with
+citation_fields(); the backfill applies the same compiled patterns to
+whole columns with pandas str.extract, streaming each CSV in chunks, so
+earlier outputs get their Conference_Name, Year and Page_Count without a
+recrawl. Only empty cells are filled, and rows saved without a Citation
+have nothing to fill them from.
+
+Usage:
+    python citations.py civilica_optimized_output_*.csv
+    python citations.py civilica_optimized_output_0_100.csv --suffix _enriched --chunk-size 50000
+"""
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+
+AUTHORS = re.compile(r'نوشته شده توسط(.*?)نویسنده مسئول')
+CONFERENCE = re.compile(r'کمیته علمی (.*?) پذیرفته شده است')
+YEAR = re.compile(r'در سال (\d{4})')
+KEYWORDS = re.compile(r'کلمات کلیدی(.*?)هستند', re.S)
+VIEW_COUNT = re.compile(r'تاکنون (\d+) بار')
+PAGE_COUNT = re.compile(r'با (\d+) صفحه')
+# Reference line tail: a venue-named part, an optional city without a venue
+# word, the year and an optional URL. Matches may only start right after a
+# '،', and the $-anchored tail leaves a single candidate part, so a line
+# without a venue fails in linear time.
+VENUE = 'همایش|کنفرانس|کنگره|سمپوزیوم|سمینار|جشنواره'
+REFERENCE_TAIL = rf'،(?:(?![^،]*(?:{VENUE}))[^،\d]*،)?\s*{{year}}\s*(?:،\s*https?://\S*\s*)?$'
+REFERENCE_CONFERENCE = re.compile(rf'(?<=،)([^،]*(?:{VENUE})[^،]*)' + REFERENCE_TAIL.format(year=r'\d{4}'))
+REFERENCE_YEAR = re.compile(REFERENCE_TAIL.format(year=r'(\d{4})'))
+
+# Output column -> patterns whose first group fills it, tried in order
+BACKFILL_COLUMNS = {
+    'Conference_Name': (CONFERENCE, REFERENCE_CONFERENCE),
+    'Year': (YEAR, REFERENCE_YEAR),
+    'Page_Count': (PAGE_COUNT,),
+}
+CHUNK_SIZE = 100000
+
+def _group(pattern, text, default=''):
+    match = pattern.search(text)
+    return match.group(1).strip() if match else default
+
+def citation_fields(text):
+    """Every field the citation text names; missing ones are '' ('0' views)"""
+    text = text or ''
+    return {
+        'authors': _group(AUTHORS, text),
+        'conference': _group(CONFERENCE, text) or _group(REFERENCE_CONFERENCE, text),
+        'year': _group(YEAR, text) or _group(REFERENCE_YEAR, text),
+        'keywords': _group(KEYWORDS, text),
+        'view_count': _group(VIEW_COUNT, text, '0'),
+        'page_count': _group(PAGE_COUNT, text),
+    }
+
+def backfill_frame(frame):
+    """Fill empty BACKFILL_COLUMNS cells of a str-typed frame from its Citation column; returns cells filled"""
+    citations = frame['Citation']
+    filled = 0
+    for column, patterns in BACKFILL_COLUMNS.items():
+        for pattern in patterns:
+            missing = frame[column] == ''
+            if not missing.any():
+                break
+            values = citations[missing].str.extract(pattern, expand=False).str.strip().fillna('')
+            frame.loc[missing, column] = values
+            filled += int((values != '').sum())
+    return filled
+
+def backfill_csv(path, output_path, chunk_size=CHUNK_SIZE):
+    """Stream path through backfill_frame into output_path (may be path itself)
+
+    Returns (rows, rows with a citation, cells filled).
+    """
+    import pandas as pd
+    temporary = f'{output_path}.tmp'
+    rows = cited = filled = 0
+    chunks = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig', chunksize=chunk_size)
+    try:
+        with open(temporary, 'w', newline='', encoding='utf-8-sig') as out:
+            for chunk in chunks:
+                missing = [column for column in ('Citation', *BACKFILL_COLUMNS) if column not in chunk]
+                if missing:
+                    raise ValueError(f'{path} has no {", ".join(missing)} column')
+                cited += int((chunk['Citation'] != '').sum())
+                filled += backfill_frame(chunk)
+                chunk.to_csv(out, header=rows == 0, index=False)
+                rows += len(chunk)
+        os.replace(temporary, output_path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return rows, cited, filled
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Fill Conference_Name, Year and Page_Count of output CSVs '
+                                                 'from their Citation column')
+    parser.add_argument('paths', nargs='+', help='Output CSV files to enrich')
+    parser.add_argument('--suffix', type=str, default='',
+                        help='Write name{suffix}.csv beside each input instead of rewriting it in place')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'Rows read and enriched at a time (default: {CHUNK_SIZE})')
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        logging.error('--chunk-size must be at least 1')
+        sys.exit(2)
+
+    failed = False
+    for path in args.paths:
+        root, extension = os.path.splitext(path)
+        output_path = f'{root}{args.suffix}{extension}'
+        started = time.time()
+        try:
+            rows, cited, filled = backfill_csv(path, output_path, args.chunk_size)
+        except (OSError, ValueError) as e:
+            logging.error(f'Could not enrich {path}: {e}')
+            failed = True
+            continue
+        logging.info(f'{output_path}: filled {filled} cells in {rows} rows ({cited} with a citation) '
+                     f'in {time.time() - started:.1f}s')
+        if rows and not cited:
+            logging.warning(f'{path} has no citations to fill from; recrawl it to get these columns')
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Run one cwr.py crawl as many worker processes over shards of the conference list
+
+The filtered conference list is cut into small shards recorded in a
+manifest (shards.sqlite in the work directory). Each worker slot claims
+the next pending shard and runs it as its own cwr.py process, with its own
+event loop, connection pool and frontier, so a slow shard only holds up
+its own slot while the other slots keep taking work. Shards are resumable:
+rerunning the same command skips finished shards and resumes the rest from
+their frontiers. When every shard is finished, outputs and failed-URL logs
+are merged into the usual civilica_optimized_output_{start}_{end} and
+failed_urls_{start}_{end}.csv files.
+
+Shards are claimed from the manifest inside a write transaction, so more
+coordinators could share one manifest later; today a restart puts shards
+left 'running' by a dead coordinator back to pending.
+
+Usage:
+    python coordinator.py --start 0 --end 1000 --processes 8
+    python coordinator.py --start 0 --end 1000 --crawler-args "--archive page_archive --retries 5"
+"""
+import os
+import csv
+import sys
+import math
+import time
+import shlex
+import socket
+import signal
+import shutil
+import sqlite3
+import logging
+import argparse
+import threading
+import subprocess
+
+from cwr import (
+    DEFAULT_INPUT_CSV, DEFAULT_FILTERED_CSV, OUTPUT_CSV_PREFIX, FAILED_URLS_LOG_PREFIX,
+    INITIAL_RATE, MIN_RATE, MAX_RATE, MAX_REQUESTS_PER_HOST, filter_conferences
+)
+from sinks import SINKS, EXTENSIONS, NormalizedSink
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SHARDS_PER_PROCESS = 8      # more, smaller shards leave less work stuck behind a slow one
+SHARD_RETRIES = 2
+POLL_INTERVAL = 1.0
+INTERRUPTED_CODES = {128 + signal.SIGINT, 128 + signal.SIGTERM}  # cwr.py exit codes after an interrupt checkpoint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    start INTEGER PRIMARY KEY,
+    end INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    started REAL,
+    finished REAL,
+    returncode INTEGER
+);
+"""
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Crawl a conference range with several cwr.py processes')
+    parser.add_argument('--start', type=int, required=True, help='Start index for conference processing')
+    parser.add_argument('--end', type=int, required=True, help='End index for conference processing')
+    parser.add_argument('--input', type=str, default=DEFAULT_INPUT_CSV,
+                        help=f'Input CSV file (default: {DEFAULT_INPUT_CSV})')
+    parser.add_argument('--filtered', type=str, default=DEFAULT_FILTERED_CSV,
+                        help=f'Cached filtered conference IDs, split into shards (default: {DEFAULT_FILTERED_CSV})')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='cwr.py processes to run at once, at most --per-host (default: one per core)')
+    parser.add_argument('--shard-size', type=int, default=None,
+                        help=f'Conferences per shard (default: about {SHARDS_PER_PROCESS} shards per process)')
+    parser.add_argument('--shard-retries', type=int, default=SHARD_RETRIES,
+                        help=f'Times a shard whose process failed is resumed (default: {SHARD_RETRIES})')
+    parser.add_argument('--work-dir', type=str, default=None,
+                        help='Directory for the manifest and per-shard files (default: shards_{start}_{end})')
+    parser.add_argument('--output-format', choices=sorted(SINKS), default='csv',
+                        help='Output format of the shards and the merged output (default: csv)')
+    parser.add_argument('--rate', type=float, default=INITIAL_RATE,
+                        help=f'Starting requests per second, split across processes (default: {INITIAL_RATE})')
+    parser.add_argument('--max-rate', type=float, default=MAX_RATE,
+                        help=f'Request rate ceiling, split across processes (default: {MAX_RATE})')
+    parser.add_argument('--per-host', type=int, default=MAX_REQUESTS_PER_HOST,
+                        help=f'Requests in flight per host, split across processes (default: {MAX_REQUESTS_PER_HOST})')
+    parser.add_argument('--crawler-args', type=str, default='',
+                        help='Extra cwr.py flags for every shard, e.g. "--retries 5 --seen-index seen.bits"')
+    return parser.parse_args()
+
+class ShardManifest:
+    """Shard ranges and their status, claimed one at a time by worker slots"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def add_shards(self, start, end, size):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            # A rerun keeps the first run's shard boundaries, which its frontiers belong to
+            if self.conn.execute('SELECT COUNT(*) FROM shards').fetchone()[0] == 0:
+                self.conn.executemany(
+                    'INSERT INTO shards (start, end) VALUES (?, ?)',
+                    [(first, min(first + size, end)) for first in range(start, end, size)]
+                )
+            # Nothing from an earlier coordinator is still running
+            self.conn.execute("UPDATE shards SET status = 'pending', worker = NULL WHERE status = 'running'")
+            self.conn.execute('COMMIT')
+
+    def claim(self, worker, max_attempts):
+        """Mark the first runnable shard as running for worker and return (start, end), or None"""
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            row = self.conn.execute(
+                "SELECT start, end FROM shards WHERE status = 'pending' "
+                "OR (status = 'failed' AND attempts < ?) ORDER BY attempts, start LIMIT 1",
+                (max_attempts,)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE shards SET status = 'running', worker = ?, attempts = attempts + 1, started = ? "
+                    "WHERE start = ?", (worker, time.time(), row[0])
+                )
+            self.conn.execute('COMMIT')
+            return row
+
+    def finish(self, start, returncode, interrupted=False):
+        # A shard stopped by a signal it handled checkpointed and exited 128 + signal;
+        # it resumes like one the coordinator interrupted itself
+        interrupted = interrupted or returncode in INTERRUPTED_CODES
+        status = 'pending' if interrupted else ('done' if returncode == 0 else 'failed')
+        with self.lock:
+            self.conn.execute(
+                'UPDATE shards SET status = ?, finished = ?, returncode = ? WHERE start = ?',
+                (status, time.time(), returncode, start)
+            )
+
+    def shards(self):
+        with self.lock:
+            return self.conn.execute(
+                'SELECT start, end, status, attempts, started, finished FROM shards ORDER BY start'
+            ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+class Coordinator:
+    def __init__(self, args):
+        self.args = args
+        self.work_dir = os.path.abspath(args.work_dir or f'shards_{args.start}_{args.end}')
+        self.manifest = None
+        self.processes = {}
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    def shard_command(self, start, end):
+        args = self.args
+        processes = args.processes
+        return [
+            sys.executable, os.path.join(REPO_DIR, 'cwr.py'),
+            '--start', str(start), '--end', str(end),
+            # The filtered list is already cached, so each shard only reads its slice
+            '--input', os.path.abspath(args.input), '--filtered', os.path.abspath(args.filtered),
+            '--output-format', args.output_format,
+            # The host's politeness budget is shared by every process
+            '--rate', str(args.rate / processes), '--max-rate', str(args.max_rate / processes),
+            '--min-rate', str(min(MIN_RATE, args.rate / processes)),
+            # main() keeps processes <= per_host, so every process gets at least one
+            '--per-host', str(args.per_host // processes),
+            # Each process already has a core; parsing stays on its event loop
+            '--parse-workers', '0',
+            *shlex.split(args.crawler_args)
+        ]
+
+    def worker(self, slot):
+        name = f'{socket.gethostname()}:{os.getpid()}:{slot}'
+        while not self.stopping.is_set():
+            shard = self.manifest.claim(name, self.args.shard_retries + 1)
+            if shard is None:
+                return
+            start, end = shard
+            started = time.time()
+            logging.info(f'[slot {slot}] shard {start}-{end} started')
+            with open(os.path.join(self.work_dir, f'shard_{start}_{end}.log'), 'a') as log:
+                # Own session: a terminal Ctrl-C reaches the coordinator only, which
+                # then interrupts each shard exactly once
+                process = subprocess.Popen(self.shard_command(start, end), cwd=self.work_dir,
+                                           stdout=log, stderr=subprocess.STDOUT,
+                                           start_new_session=hasattr(os, 'setsid'))
+                with self.lock:
+                    self.processes[start] = process
+                returncode = process.wait()
+                with self.lock:
+                    del self.processes[start]
+            self.manifest.finish(start, returncode, interrupted=self.stopping.is_set())
+            level = logging.INFO if returncode == 0 else logging.ERROR
+            logging.log(level, f'[slot {slot}] shard {start}-{end} exited with {returncode} '
+                               f'after {time.time() - started:.1f}s')
+
+    def interrupt(self):
+        """Ask every running shard to checkpoint and stop"""
+        self.stopping.set()
+        with self.lock:
+            for process in self.processes.values():
+                try:
+                    process.send_signal(signal.SIGINT)
+                except ProcessLookupError:
+                    pass
+
+    def shard_paths(self, start, end):
+        extension = EXTENSIONS[self.args.output_format]
+        return (os.path.join(self.work_dir, f'{OUTPUT_CSV_PREFIX}_{start}_{end}{extension}'),
+                os.path.join(self.work_dir, f'{FAILED_URLS_LOG_PREFIX}_{start}_{end}.csv'))
+
+    def merge(self, shards):
+        """Combine shard outputs and failed-URL logs in shard order; return (rows, failed URLs)"""
+        args = self.args
+        extension = EXTENSIONS[args.output_format]
+        output_path = f'{OUTPUT_CSV_PREFIX}_{args.start}_{args.end}{extension}'
+        failed_path = f'{FAILED_URLS_LOG_PREFIX}_{args.start}_{args.end}.csv'
+        rows = failed = 0
+
+        if args.output_format == 'csv':
+            with open(output_path, 'w', newline='', encoding='utf-8-sig') as out:
+                writer = None
+                for start, end, *_ in shards:
+                    path = self.shard_paths(start, end)[0]
+                    if not os.path.exists(path):
+                        continue
+                    with open(path, newline='', encoding='utf-8-sig') as f:
+                        reader = csv.reader(f)
+                        header = next(reader, None)
+                        if header is None:
+                            continue
+                        if writer is None:
+                            writer = csv.writer(out)
+                            writer.writerow(header)
+                        for row in reader:
+                            writer.writerow(row)
+                            rows += 1
+        elif args.output_format == 'normalized':
+            # Author and affiliation IDs are per shard, so their names are interned again
+            sink = NormalizedSink(output_path, truncate=True)
+            for start, end, *_ in shards:
+                path = self.shard_paths(start, end)[0]
+                if os.path.isdir(path):
+                    rows += sink.merge(path)
+            sink.close()
+        else:
+            # Shards hold disjoint conferences, so their partitions move over as they are
+            if os.path.isdir(output_path):
+                shutil.rmtree(output_path)
+            os.makedirs(output_path)
+            for start, end, *_ in shards:
+                path = self.shard_paths(start, end)[0]
+                if not os.path.isdir(path):
+                    continue
+                for partition in os.listdir(path):
+                    target = os.path.join(output_path, partition)
+                    os.makedirs(target, exist_ok=True)
+                    for name in os.listdir(os.path.join(path, partition)):
+                        if name.endswith('.parquet'):
+                            shutil.copy2(os.path.join(path, partition, name), os.path.join(target, name))
+                            rows += 1
+
+        # Like cwr.py, only leave a failure log when something failed
+        temporary = f'{failed_path}.tmp'
+        with open(temporary, 'w', newline='') as out:
+            writer = None
+            for start, end, *_ in shards:
+                path = self.shard_paths(start, end)[1]
+                if not os.path.exists(path):
+                    continue
+                with open(path, newline='') as f:
+                    reader = csv.reader(f)
+                    header = next(reader, None)
+                    if header is None:
+                        continue
+                    if writer is None:
+                        writer = csv.writer(out)
+                        writer.writerow(header)
+                    for row in reader:
+                        writer.writerow(row)
+                        failed += 1
+        if failed:
+            os.replace(temporary, failed_path)
+        else:
+            os.remove(temporary)
+            if os.path.exists(failed_path):
+                os.remove(failed_path)
+        return output_path, rows, failed_path, failed
+
+    def run(self):
+        args = self.args
+        os.makedirs(self.work_dir, exist_ok=True)
+        ids = filter_conferences(args.input, args.filtered)
+        end = min(args.end, len(ids))
+        if args.start >= end:
+            logging.error(f'No conferences between index {args.start} and {args.end} ({len(ids)} available)')
+            return False
+        size = args.shard_size or max(1, math.ceil((end - args.start) / (args.processes * SHARDS_PER_PROCESS)))
+
+        self.manifest = ShardManifest(os.path.join(self.work_dir, 'shards.sqlite'))
+        self.manifest.add_shards(args.start, end, size)
+        shards = self.manifest.shards()
+        pending = sum(1 for shard in shards if shard[2] != 'done')
+        logging.info(f'{end - args.start} conferences in {len(shards)} shards of up to {size}; '
+                     f'{pending} to run on {args.processes} processes; files in {self.work_dir}')
+
+        started = time.time()
+        threads = [threading.Thread(target=self.worker, args=(slot,), daemon=True)
+                   for slot in range(args.processes)]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(POLL_INTERVAL)
+        except KeyboardInterrupt:
+            logging.warning('Interrupted, stopping shards; rerun the same command to resume')
+            self.interrupt()
+            for thread in threads:
+                thread.join()
+            self.manifest.close()
+            return False
+
+        shards = self.manifest.shards()
+        self.manifest.close()
+        unfinished = [f'{start}-{end}' for start, end, status, *_ in shards if status != 'done']
+        timed = sorted((finished - begun, start, end) for start, end, status, _, begun, finished in shards
+                       if status == 'done' and begun and finished)
+        if timed:
+            logging.info(f'Shard times: median {timed[len(timed) // 2][0]:.1f}s, slowest '
+                         + ', '.join(f'{start}-{end} {seconds:.1f}s' for seconds, start, end in timed[:-4:-1]))
+        if unfinished:
+            logging.error(f'Shards still failing after {args.shard_retries} retries: {", ".join(unfinished)}; '
+                          f'their partial results are merged and a rerun retries them')
+
+        output_path, rows, failed_path, failed = self.merge(shards)
+        unit = 'files' if args.output_format == 'parquet' else 'rows'
+        logging.info(f'Finished in {time.time() - started:.1f}s: merged {rows} {unit} into {output_path}'
+                     + (f' and {failed} failed URLs into {failed_path}' if failed else ', no failed URLs'))
+        return not unfinished
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+    if args.start < 0 or args.end <= args.start:
+        logging.error('Invalid start/end values. End must be greater than start, and start must be >= 0')
+        sys.exit(2)
+    if args.processes < 1 or (args.shard_size is not None and args.shard_size < 1) or args.shard_retries < 0 \
+            or args.per_host < 1:
+        logging.error('--processes, --shard-size and --per-host must be at least 1 and --shard-retries not negative')
+        sys.exit(2)
+    if args.processes > args.per_host:
+        # Each process needs a request slot of the host's budget
+        logging.warning(f'Running {args.per_host} processes instead of {args.processes}: '
+                        f'--per-host {args.per_host} is split across them')
+        args.processes = args.per_host
+    if not Coordinator(args).run():
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
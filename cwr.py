@@ -1,37 +1,72 @@
 #!/usr/bin/env python3
 import os
+import sys
+import csv
 import time
 import random
 import logging
-import csv
 import json
-import pandas as pd
+import hashlib
+import itertools
 import re
+import signal
 import asyncio
 import aiohttp
 import argparse
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from concurrent.futures import ThreadPoolExecutor
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-import requests
-import nest_asyncio
-nest_asyncio.apply()
+from lxml import etree
+from lxml import html as lxml_html
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin, urlparse
+from frontier import CrawlFrontier
+from archive import PageArchive
+from http_cache import HttpCache
+from sinks import SINKS, EXTENSIONS, PARQUET_AVAILABLE, OutputWriter
+from seen_index import SeenIndex, doc_id
+from freshness import FreshnessIndex, content_hash
+from metrics import CrawlMetrics, describe_error
+from citations import citation_fields
+from transport import TransportConfig, DEFAULTS as TRANSPORT_DEFAULTS, connection_trace
+from title_filter import TitleFilter, load_keywords
 
 # Default configuration
+BASE_URL = 'https://civilica.com'
 DEFAULT_INPUT_CSV = './data/conferences_merged_full.csv'
 DEFAULT_FILTERED_CSV = 'filtered_conference_ids.csv'
 OUTPUT_CSV_PREFIX = 'civilica_optimized_output'
 FAILED_URLS_LOG_PREFIX = 'failed_urls'
+FRONTIER_PREFIX = 'crawl_frontier'
+REPLAY_OUTPUT_PREFIX = 'civilica_replay_output'
+RECRAWL_OUTPUT_PREFIX = 'civilica_recrawl_output'
+DEFAULT_ARCHIVE_DIR = 'page_archive'
 MAX_WORKERS = 2
-REQUEST_TIMEOUT = 15
+MAX_CONCURRENT_REQUESTS = 8
+MAX_REQUESTS_PER_HOST = 4
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+PARSE_QUEUE_SIZE = 64       # pages being fetched, waiting for or inside the parse pool
+PAGE_ENCODING = 'utf-8'
+NOT_MODIFIED = 304          # also reported when a 200 body matches the cached one
 MAX_RETRIES = 3
-REQUEST_DELAY = (1.2, 2.5)
-SAVE_EVERY = 500
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+RETRY_BACKOFF = 0.5         # base delay, doubled on every attempt
+RETRY_BACKOFF_MAX = 30.0
+REQUEUE_ROUNDS = 2          # passes over failed URLs at the end of a run
+INITIAL_RATE = 2.0          # requests per second across the whole crawl
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+RATE_BURST = 2              # tokens the bucket can hold
+RATE_INCREASE = 0.5         # additive increase, requests/s per second of healthy traffic
+RATE_DECREASE = 0.5         # multiplicative decrease on 429/5xx/timeouts
+RATE_COOLDOWN = 2.0         # minimum seconds between two decreases
+LATENCY_TARGET = 5.0        # seconds; slower average responses hold the rate steady
+BROWSER_WORKERS = 1         # WebDriver sessions for --browser-fallback
+BROWSER_TIMEOUT = 30        # page load timeout of a WebDriver session
+RENDER_WAIT = 10.0          # seconds a loaded page may take to render the required markup
+RENDER_POLL = 0.2
+METRICS_INTERVAL = 10.0     # seconds between JSON metrics snapshots
+SAVE_EVERY = 500            # rows per output flush
+SAVE_INTERVAL = 5.0         # seconds before a partial batch is flushed anyway
+WRITE_QUEUE_SIZE = 1000     # rows waiting for the writer before fetchers pause
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -42,8 +77,94 @@ def parse_arguments():
                        help=f'Input CSV file (default: {DEFAULT_INPUT_CSV})')
     parser.add_argument('--filtered', type=str, default=DEFAULT_FILTERED_CSV,
                        help=f'Filtered output CSV (default: {DEFAULT_FILTERED_CSV})')
+    parser.add_argument('--base-url', type=str, default=BASE_URL,
+                       help=f'Site to crawl, e.g. a local mock_civilica.py server (default: {BASE_URL})')
     parser.add_argument('--workers', type=int, default=MAX_WORKERS,
-                       help=f'Number of concurrent workers (default: {MAX_WORKERS})')
+                       help=f'Number of conferences processed concurrently (default: {MAX_WORKERS})')
+    parser.add_argument('--max-requests', type=int, default=MAX_CONCURRENT_REQUESTS,
+                       help=f'Maximum requests in flight in total (default: {MAX_CONCURRENT_REQUESTS})')
+    parser.add_argument('--per-host', type=int, default=MAX_REQUESTS_PER_HOST,
+                       help=f'Maximum requests in flight per host (default: {MAX_REQUESTS_PER_HOST})')
+    parser.add_argument('--transport-config', type=str, default=None,
+                       help='JSON file of transport settings (see transport.py); the flags below override it')
+    parser.add_argument('--connect-timeout', type=float, default=None,
+                       help=f"Seconds to open a connection (default: {TRANSPORT_DEFAULTS['connect_timeout']})")
+    parser.add_argument('--read-timeout', type=float, default=None,
+                       help=f"Longest wait between two chunks of a response (default: {TRANSPORT_DEFAULTS['read_timeout']})")
+    parser.add_argument('--list-timeout', type=float, default=None,
+                       help=f"Total seconds for a list page request (default: {TRANSPORT_DEFAULTS['list_timeout']})")
+    parser.add_argument('--article-timeout', type=float, default=None,
+                       help=f"Total seconds for an article request (default: {TRANSPORT_DEFAULTS['article_timeout']})")
+    parser.add_argument('--keepalive-timeout', type=float, default=None,
+                       help=f"Seconds an idle connection is kept for reuse (default: {TRANSPORT_DEFAULTS['keepalive_timeout']})")
+    parser.add_argument('--dns-cache-ttl', type=int, default=None,
+                       help=f"Seconds resolved addresses are cached, 0 for no expiry (default: {TRANSPORT_DEFAULTS['dns_cache_ttl']})")
+    parser.add_argument('--user-agent', type=str, default=None, help='User-Agent header sent with every request')
+    parser.add_argument('--no-compression', dest='compression', action='store_false', default=None,
+                       help='Ask for uncompressed responses instead of gzip/brotli')
+    parser.add_argument('--archive', type=str, default=None,
+                       help='Directory of the compressed page archive; every fetched page is stored there')
+    parser.add_argument('--replay', action='store_true',
+                       help=f'Re-extract from the page archive without network access (default archive: {DEFAULT_ARCHIVE_DIR})')
+    parser.add_argument('--http-cache', type=str, default=None,
+                       help='SQLite HTTP cache for conditional requests; unchanged articles are not parsed or '
+                            'written again and --fresh appends to the existing output')
+    parser.add_argument('--seen-index', type=str, default=None,
+                       help='Bitmap of doc IDs already written, shared across runs and ranges; those '
+                            'articles are skipped. Delete the file to start a new crawl epoch')
+    parser.add_argument('--freshness', type=str, default=None,
+                       help='SQLite change history of conference listings and articles, updated by every run '
+                            'that uses it and read by --recrawl-budget')
+    parser.add_argument('--recrawl-budget', type=int, default=None,
+                       help='Recrawl the range from --freshness history: list new conferences in full, outside the '
+                            'budget, and spend at most this many requests on the known listings and articles '
+                            'most likely to have changed')
+    parser.add_argument('--title-keywords', type=str, default=None,
+                       help='File of keywords, one per line; only listed articles whose title contains one '
+                            'are fetched (Persian spelling variants, ZWNJ and digits are normalized)')
+    parser.add_argument('--title-keyword', action='append', default=[],
+                       help='A keyword for the title filter; repeat for more, combines with --title-keywords')
+    parser.add_argument('--browser-fallback', action='store_true',
+                       help='Fetch again with Edge (via Selenium) when a page arrives without its article '
+                            'list or abstract markup, e.g. because it is rendered by JavaScript')
+    parser.add_argument('--driver', type=str, default=None,
+                       help='Edge WebDriver executable for --browser-fallback (default: found by Selenium Manager)')
+    parser.add_argument('--browser-workers', type=int, default=BROWSER_WORKERS,
+                       help=f'Browser sessions for --browser-fallback (default: {BROWSER_WORKERS})')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on 127.0.0.1:PORT/metrics (JSON at /metrics.json)')
+    parser.add_argument('--metrics-json', type=str, default=None,
+                       help='Rewrite a JSON metrics snapshot at this path every --metrics-interval seconds')
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL,
+                       help=f'Seconds between JSON metrics snapshots (default: {METRICS_INTERVAL})')
+    parser.add_argument('--output-format', choices=sorted(SINKS), default='csv',
+                       help='csv: one CSV file; parquet: a directory of zstd Parquet files '
+                            'partitioned by Conference_ID (needs pyarrow); normalized: a directory of CSV tables with '
+                            'interned authors and affiliations (default: csv)')
+    parser.add_argument('--save-every', type=int, default=SAVE_EVERY,
+                       help=f'Rows per output flush (default: {SAVE_EVERY})')
+    parser.add_argument('--save-interval', type=float, default=SAVE_INTERVAL,
+                       help=f'Seconds before a partial batch is flushed (default: {SAVE_INTERVAL})')
+    parser.add_argument('--write-queue', type=int, default=WRITE_QUEUE_SIZE,
+                       help=f'Rows allowed to wait for the writer before fetchers pause (default: {WRITE_QUEUE_SIZE})')
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                       help=f'Processes used to parse pages, 0 parses on the event loop (default: {PARSE_WORKERS})')
+    parser.add_argument('--parse-queue', type=int, default=PARSE_QUEUE_SIZE,
+                       help=f'Pages fetched or parsed at once; further fetches wait for the parsers (default: {PARSE_QUEUE_SIZE})')
+    parser.add_argument('--frontier', type=str, default=None,
+                       help=f'Frontier database used to resume runs (default: {FRONTIER_PREFIX}_<start>_<end>.sqlite)')
+    parser.add_argument('--fresh', action='store_true',
+                       help='Discard any saved frontier and output and start the range from scratch')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES,
+                       help=f'Retries per request for retryable statuses and errors (default: {MAX_RETRIES})')
+    parser.add_argument('--requeue-rounds', type=int, default=REQUEUE_ROUNDS,
+                       help=f'Passes over failed URLs at the end of the run (default: {REQUEUE_ROUNDS})')
+    parser.add_argument('--rate', type=float, default=INITIAL_RATE,
+                       help=f'Initial request rate in requests/s (default: {INITIAL_RATE})')
+    parser.add_argument('--min-rate', type=float, default=MIN_RATE,
+                       help=f'Lowest rate the limiter backs off to (default: {MIN_RATE})')
+    parser.add_argument('--max-rate', type=float, default=MAX_RATE,
+                       help=f'Highest rate the limiter ramps up to (default: {MAX_RATE})')
     return parser.parse_args()
 
 def setup_logging():
@@ -57,62 +178,605 @@ def setup_logging():
         ]
     )
 
-def create_session():
-    """Create resilient HTTP session"""
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504]
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    session.headers.update(HEADERS)
-    return session
+def _file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Cells pandas.read_csv reads as NA by default; the pandas filter this
+# replaces dropped them, and --start/--end indices depend on it
+PANDAS_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+FILTER_VERSION = 2          # bumped when the filter changes, so cached lists are rebuilt
+
+def filter_conferences(input_csv, filtered_csv, end=None):
+    """Conference IDs that have keywords, in input order, up to index end
+
+    Keywords cells pandas would read as NA ('NA', 'nan', 'null', ...) count
+    as empty. The filtered list is kept in filtered_csv with a stamp of the
+    input's size, mtime and content hash beside it, and is only rebuilt
+    when the input or the filter changes. Only the rows up to end are read
+    back.
+    """
+    stamp_path = filtered_csv + '.stamp.json'
+    info = os.stat(input_csv)
+    source = {'input': os.path.abspath(input_csv), 'size': info.st_size, 'mtime_ns': info.st_mtime_ns,
+              'filter': FILTER_VERSION}
+    try:
+        with open(stamp_path) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        stamp = {}
+    fresh = os.path.exists(filtered_csv) and {k: stamp.get(k) for k in source} == source
+    if not fresh and os.path.exists(filtered_csv) and stamp.get('input') == source['input'] \
+            and stamp.get('size') == source['size'] and stamp.get('filter') == FILTER_VERSION:
+        # Touched but not changed, e.g. by a fresh checkout: the hash decides
+        fresh = stamp.get('hash') == _file_hash(input_csv)
+        if fresh:
+            stamp.update(source)
+            with open(stamp_path, 'w') as f:
+                json.dump(stamp, f)
+    if not fresh:
+        temporary = f'{filtered_csv}.{os.getpid()}.tmp'
+        with open(input_csv, newline='', encoding='utf-8-sig') as src, \
+                open(temporary, 'w', newline='', encoding='utf-8') as dst:
+            writer = csv.writer(dst)
+            writer.writerow(['id', 'keywords'])
+            for row in csv.DictReader(src):
+                if (row.get('keywords') or '') not in PANDAS_NA_VALUES:
+                    writer.writerow([row['id'], row['keywords']])
+        os.replace(temporary, filtered_csv)
+        with open(stamp_path, 'w') as f:
+            json.dump(dict(source, hash=_file_hash(input_csv)), f)
+    
+    with open(filtered_csv, newline='', encoding='utf-8') as f:
+        return [row[0] for row in itertools.islice(csv.reader(f), 1, None if end is None else end + 1)]
+
+class HttpStatusError(Exception):
+    """A response whose status means the page could not be used"""
+
+    def __init__(self, status):
+        super().__init__(f"Status {status}")
+        self.status = status
+
+def _with_classes(*names):
+    """XPath predicate matching elements whose class list holds every name"""
+    return ' and '.join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names)
+
+class ArticleExtractor:
+    """Pull every article field out of a single lxml tree with precompiled XPath
+
+    Mirrors the selectors the BeautifulSoup parser used; the keywords
+    container keeps its substring match on the class attribute.
+    """
+
+    abstract = etree.XPath(
+        f"(//div[{_with_classes('prose', 'max-w-none', 'my-6', 'text-color-black', 'text-justify')}]/div)[1]")
+    citation = etree.XPath(
+        f"(//blockquote[{_with_classes('container', 'mx-auto', 'mb-8')}])[1]/descendant::p[1]")
+    author_blocks = etree.XPath(f"//div[{_with_classes('my-2', 'flex', 'flex-row', 'items-center')}]")
+    author_name = etree.XPath(f"(.//div[{_with_classes('flex', 'flex-col')}]/a)[1]")
+    author_place = etree.XPath(f"(.//div[{_with_classes('flex', 'flex-col')}]/p)[1]")
+    view_count = etree.XPath(f"(//span[{_with_classes('text-color-muted')}])[1]")
+    keyword_divs = etree.XPath(
+        "(//div[" + ' and '.join(f"contains(@class, '{name}')" for name in
+                                 ('text-color-base', 'pt-2', 'p-4', 'my-4', 'bg-white', 'border', 'rounded'))
+        + "])[1]//div")
+    view_digits = re.compile(r'(\d+)')
+
+    def __init__(self, encoding=PAGE_ENCODING):
+        self.encoding = encoding
+        self.parser = lxml_html.HTMLParser(encoding=encoding)
+
+    def parse(self, html):
+        """Parse raw response bytes (or an already decoded str) into a tree"""
+        if isinstance(html, str):
+            html = html.encode(self.encoding)
+        try:
+            return lxml_html.document_fromstring(html, parser=self.parser)
+        except etree.ParserError:
+            # Empty body: report blank fields like the old parser did
+            return lxml_html.document_fromstring(b'<html></html>', parser=self.parser)
+
+    @staticmethod
+    def _text(nodes):
+        return nodes[0].text_content().strip() if nodes else ''
+
+    def keywords(self, tree):
+        # Same as get_text(strip=True) on each div below the container
+        keywords = []
+        for div in self.keyword_divs(tree):
+            text = ''.join(piece.strip() for piece in div.itertext())
+            if text:
+                keywords.append(text)
+        return ', '.join(keywords)
+
+    def extract(self, html):
+        """Return the article fields parse_article_page reports"""
+        tree = self.parse(html)
+        
+        authors_map = {}
+        for block in self.author_blocks(tree):
+            name_tag = self.author_name(block)
+            if name_tag:
+                authors_map[self._text(name_tag)] = self._text(self.author_place(block))
+        
+        view_count = '0'
+        match = self.view_digits.search(self._text(self.view_count(tree)))
+        if match:
+            view_count = match.group(1)
+        
+        citation = self._text(self.citation(tree))
+        cited = citation_fields(citation)
+        return {
+            'abstract': self._text(self.abstract(tree)),
+            'citation': citation,
+            'authors': ', '.join(authors_map.keys()),
+            'conference': cited['conference'],
+            'year': cited['year'],
+            'keywords': self.keywords(tree),
+            'view_count': view_count,
+            'page_count': cited['page_count'],
+            'authors_map': authors_map
+        }
+
+_row_extractor = None
+
+def build_article_row(conference_id, title, link, html):
+    """Parse an article page into an output CSV row; runs inside parse workers"""
+    global _row_extractor
+    if _row_extractor is None:
+        _row_extractor = ArticleExtractor()
+    details = _row_extractor.extract(html)
+    return [
+        conference_id, title, link,
+        details['abstract'], details['citation'],
+        details['authors'], details['conference'],
+        details['year'], details['keywords'],
+        details['view_count'], details['page_count'],
+        json.dumps(details['authors_map'], ensure_ascii=False)
+    ]
+
+def _init_parse_worker():
+    # Ctrl-C is handled by the crawler process, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+class ParseStage:
+    """Parse pages in a pool of worker processes, off the event loop
+
+    Raw HTML goes in and rows or article links come out. A fetcher takes
+    one of queue_size slots with slot() before it requests a page and
+    holds it until the page is parsed, so at most queue_size pages are in
+    flight, waiting for or sitting in the pool; further fetches wait until
+    parsing catches up. With no workers, pages are parsed inline on the
+    event loop.
+    """
+
+    def __init__(self, workers, queue_size, metrics=None):
+        self.workers = workers
+        self.metrics = metrics
+        self.pool = None
+        if workers:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(workers, initializer=_init_parse_worker)
+        self.slots = asyncio.Semaphore(queue_size)
+        self.queued = 0
+
+    def slot(self):
+        """Async context manager held from a page's request until it is parsed"""
+        return self.slots
+
+    async def run(self, func, *args):
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            if self.pool is None:
+                return func(*args)
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            self.queued -= 1
+            if self.metrics is not None:
+                self.metrics.observe('parse', time.monotonic() - started)
+
+    async def list_page(self, html, conference_id, base_url=BASE_URL):
+        return await self.run(CivilicaScraper.parse_list_page, html, conference_id, base_url)
+
+    async def article_row(self, conference_id, title, link, html):
+        return await self.run(build_article_row, conference_id, title, link, html)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+class CrawlScheduler:
+    """Bound the number of requests in flight, in total and per host
+
+    Slots are taken before a request is handed to aiohttp, so time spent
+    waiting for a slot never counts against the request timeouts.
+    """
+
+    def __init__(self, max_requests, max_per_host):
+        self.max_requests = max_requests
+        self.max_per_host = max_per_host
+        self.request_slots = asyncio.Semaphore(max_requests)
+        self.host_slots = {}
+        self.in_flight = 0
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self.host_slots[host]
+
+    @asynccontextmanager
+    async def request(self, url):
+        """Hold one request slot for url while the body runs"""
+        # Take the host slot first so a request waiting on a busy host
+        # does not sit on a global slot other hosts could use.
+        async with self._host_slot(url):
+            async with self.request_slots:
+                self.in_flight += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+
+class AdaptiveRateLimiter:
+    """Shared token bucket whose refill rate adapts to server health (AIMD)
+
+    Healthy, fast responses raise the rate additively; 429s, 5xx responses,
+    timeouts and dropped connections cut it multiplicatively. While the
+    latency average sits above LATENCY_TARGET the rate is held steady.
+    """
+
+    def __init__(self, rate, min_rate, max_rate, burst=RATE_BURST):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.paused_until = 0.0
+        self.latency_avg = None
+        self.state = 'increasing'
+        self.decreases = 0
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self.lock:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def record(self, status=None, latency=None, retry_after=None):
+        """Feed back the outcome of a request; status None means it failed in transit"""
+        if status is None or status == 429 or status >= 500:
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            self._decrease()
+            return
+        
+        if latency is not None:
+            if self.latency_avg is None:
+                self.latency_avg = latency
+            else:
+                self.latency_avg = 0.8 * self.latency_avg + 0.2 * latency
+        
+        if self.latency_avg is not None and self.latency_avg > LATENCY_TARGET:
+            self.state = 'holding'
+            return
+        
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + RATE_INCREASE / self.rate)
+        self.state = 'increasing' if self.rate < self.max_rate else 'at-max'
+
+    def _decrease(self):
+        # One congestion event usually fails several in-flight requests;
+        # only cut the rate once per cooldown window.
+        now = time.monotonic()
+        self.state = 'backoff'
+        if now - self.last_decrease < RATE_COOLDOWN:
+            return
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+        self.last_decrease = now
+        self.decreases += 1
+        logging.warning(f"Rate limiter backing off to {self.rate:.2f} req/s")
+
+    def snapshot(self):
+        """Current limiter state for logging"""
+        return {
+            'rate': round(self.rate, 3),
+            'state': self.state,
+            'tokens': round(self.tokens, 3),
+            'latency_avg': round(self.latency_avg, 3) if self.latency_avg is not None else None,
+            'decreases': self.decreases,
+        }
+
+    def __str__(self):
+        latency = f"{self.latency_avg:.2f}s" if self.latency_avg is not None else 'n/a'
+        return f"{self.rate:.2f} req/s ({self.state}, avg latency {latency})"
+
+# Elements a page must contain to be parsed. A 200 response without them
+# (e.g. rendered client-side) is fetched again with the browser fallback.
+LIST_REQUIRED = re.compile(rb'id=["\']?articleLists\b')
+ARTICLE_REQUIRED = re.compile(rb'class=["\'][^"\']*\bprose\b')
+
+class HttpFetcher:
+    """aiohttp fetch backend: scheduler slots, adaptive rate limit, retries, HTTP cache and archive
+
+    Every fetch backend has async fetch(url, required=None, stage=None)
+    returning (status, body bytes or None) and async close(). required is
+    a bytes pattern the page must contain; only FallbackFetcher acts on
+    it. stage ('list' or 'article') picks the request timeout.
+    """
+
+    def __init__(self, session, transport, scheduler, rate_limiter, retries, metrics,
+                 http_cache=None, archive=None):
+        self.session = session
+        self.transport = transport
+        self.scheduler = scheduler
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.metrics = metrics
+        self.http_cache = http_cache
+        self.archive = archive
+
+    async def fetch_once(self, url, stage=None):
+        """One request through the scheduler and rate limiter
+
+        With an HTTP cache, unchanged pages come back as NOT_MODIFIED together
+        with the cached body. New article responses are only staged in the
+        cache: the crawler commits them once the article's row is on disk.
+        """
+        async with self.scheduler.request(url):
+            await self.rate_limiter.acquire()
+            started = time.monotonic()
+            headers = self.http_cache.request_headers(url) if self.http_cache is not None else None
+            try:
+                async with self.session.get(url, timeout=self.transport.timeout(stage),
+                                            headers=headers) as response:
+                    # Error bodies are read too, so the connection goes back to the pool
+                    html = await response.read()
+                    if response.status != 200:
+                        html = None
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                self.rate_limiter.record()
+                self.metrics.observe('fetch', time.monotonic() - started)
+                raise
+            latency = time.monotonic() - started
+            retry_after = response.headers.get('Retry-After', '')
+            self.rate_limiter.record(
+                response.status, latency,
+                retry_after=float(retry_after) if retry_after.isdigit() else None
+            )
+            self.metrics.observe('fetch', latency)
+            self.metrics.record_response(urlparse(url).netloc, response.status, len(html or b''))
+            status = response.status
+            if self.http_cache is not None:
+                if status == NOT_MODIFIED:
+                    html = self.http_cache.body(url)
+                    self.http_cache.touch(url)
+                elif html is not None and not self.http_cache.store(url, response.headers, html,
+                                                                     stage=stage == 'article'):
+                    status = NOT_MODIFIED
+            if status == 200 and self.archive is not None:
+                self.archive.put(url, html)
+            return status, html
+
+    async def fetch(self, url, required=None, stage=None):
+        """fetch_once() with jittered exponential backoff on retryable statuses and errors"""
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                status, html = await self.fetch_once(url, stage)
+            except RETRY_EXCEPTIONS as e:
+                self.metrics.record_error('fetch', e)
+                if last_attempt:
+                    raise
+                reason = describe_error(e)
+            else:
+                if status not in RETRY_STATUSES or last_attempt:
+                    return status, html
+                reason = f"Status {status}"
+            # Full jitter keeps retries from many requests from lining up
+            delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+            logging.warning(f"Retrying {url} in {delay:.1f}s after {reason} "
+                            f"(attempt {attempt + 1}/{self.retries})")
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        pass
+
+class ArchiveFetcher:
+    """Replay fetch backend: pages come from the page archive, never the network"""
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    async def fetch(self, url, required=None, stage=None):
+        html = self.archive.get(url)
+        return (200, html) if html is not None else (404, None)
+
+    async def close(self):
+        pass
+
+class BrowserFetcher:
+    """Selenium fetch backend: page loads on worker threads with drivers from a script.DriverPool
+
+    The pool starts drivers on first use, replaces ones whose session died
+    and restarts worn-out ones; it should hold as many drivers as there are
+    workers. Page loads are paced by rate_limiter, if given, like HTTP requests.
+    """
+
+    def __init__(self, pool, workers, rate_limiter=None):
+        from concurrent.futures import ThreadPoolExecutor
+        self.pool = pool
+        self.rate_limiter = rate_limiter
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='browser')
+
+    def _get(self, url, required):
+        driver = self.pool.acquire()
+        try:
+            # Drivers return once the DOM is ready; scripts may still be rendering
+            driver.get(url)
+            deadline = time.monotonic() + RENDER_WAIT
+            while True:
+                html = driver.page_source.encode(PAGE_ENCODING)
+                if required is None or required.search(html) or time.monotonic() > deadline:
+                    return html
+                time.sleep(RENDER_POLL)
+        finally:
+            # A crashed session is replaced when it is next checked out
+            self.pool.release(driver, 1)
+
+    async def fetch(self, url, required=None, stage=None):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        return 200, await asyncio.get_running_loop().run_in_executor(self.executor, self._get, url, required)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        # Page loads still running hand their drivers back before the pool quits them
+        await loop.run_in_executor(None, self.executor.shutdown)
+        await loop.run_in_executor(None, self.pool.close)
+
+class FallbackFetcher:
+    """Fetch with primary; 200 pages missing their required elements go to fallback
+
+    Keeps most traffic on the cheap HTTP path and only renders the pages
+    that need it in the browser. Rendered pages replace the unrendered
+    ones in archive, if given, so a replay sees what was parsed.
+    """
+
+    def __init__(self, primary, fallback, metrics, archive=None):
+        self.primary = primary
+        self.fallback = fallback
+        self.metrics = metrics
+        self.archive = archive
+        self.fallbacks = 0
+
+    async def fetch(self, url, required=None, stage=None):
+        status, html = await self.primary.fetch(url, stage=stage)
+        # Cached bodies (NOT_MODIFIED) are checked too; error statuses pass through
+        if html is None or required is None or required.search(html):
+            return status, html
+        self.fallbacks += 1
+        started = time.monotonic()
+        try:
+            rendered_status, html = await self.fallback.fetch(url, required, stage)
+            if rendered_status == 200 and html is not None and self.archive is not None:
+                self.archive.put(url, html)
+            # NOT_MODIFIED still tells the caller the page has not changed
+            return (status if rendered_status == 200 else rendered_status), html
+        except Exception as e:
+            self.metrics.record_error('render', e)
+            raise
+        finally:
+            self.metrics.observe('render', time.monotonic() - started)
+
+    async def close(self):
+        await self.primary.close()
+        await self.fallback.close()
 
 class CivilicaScraper:
-    def __init__(self, args):
+    def __init__(self, args, transport=None, title_filter=None):
         self.args = args
-        self.output_csv = f"{OUTPUT_CSV_PREFIX}_{args.start}_{args.end}.csv"
-        self.failed_urls_log = f"{FAILED_URLS_LOG_PREFIX}_{args.start}_{args.end}.csv"
-        self.failed_urls = []
-        self.result_rows = []
+        self.transport = transport or TransportConfig()
+        # Listed articles whose title matches none of its keywords are not fetched
+        self.title_filter = title_filter
+        # Replays write beside the crawl's files, never over them
+        # and so do recrawls, which only write what they refetched
+        if args.replay:
+            mode, output_prefix = 'replay_', REPLAY_OUTPUT_PREFIX
+        elif args.recrawl_budget:
+            mode, output_prefix = 'recrawl_', RECRAWL_OUTPUT_PREFIX
+        else:
+            mode, output_prefix = '', OUTPUT_CSV_PREFIX
+        self.output_path = f"{output_prefix}_{args.start}_{args.end}{EXTENSIONS[args.output_format]}"
+        self.failed_urls_log = f"{FAILED_URLS_LOG_PREFIX}_{mode}{args.start}_{args.end}.csv"
+        self.frontier_path = args.frontier or f"{FRONTIER_PREFIX}_{mode}{args.start}_{args.end}.sqlite"
+        self.frontier = None
+        self.archive = None
+        self.http_cache = None
+        self.unchanged_count = 0
+        self.seen_index = None
+        self.duplicate_count = 0
+        # Doc ID (or URL) -> task fetching it, until its row is on disk
+        self.in_flight_articles = {}
+        self.writer = None
         self.processed_count = 0
         self.start_time = time.time()
+        self.scheduler = None
+        self.rate_limiter = None
+        self.extractor = ArticleExtractor()
+        self.parse_stage = None
+        self.metrics = CrawlMetrics()
+        self.fetcher = None
+        self.freshness = None
+        # Recrawls list only these conferences and refetch only these known articles;
+        # None lists everything
+        self.recrawl_lists = None
+        self.recrawl_articles = None
+        # Conferences the recrawl lists outside its budget, and the requests they took
+        self.recrawl_new = set()
+        self.new_conference_requests = 0
+        self.connections = {'opened': 0, 'reused': 0}
+        # Signal that stopped the crawl early, if any
+        self.interrupted = None
         
         # Create output directory if it doesn't exist
         os.makedirs('output', exist_ok=True)
         
         logging.info(f"Initialized scraper with start={args.start}, end={args.end}")
-        logging.info(f"Output will be saved to: {self.output_csv}")
+        logging.info(f"Output will be saved to: {self.output_path}")
         logging.info(f"Failed URLs will be logged to: {self.failed_urls_log}")
+        logging.info(f"Crawl frontier: {self.frontier_path}")
+        if args.replay:
+            logging.info(f"Replaying pages from archive: {args.archive or DEFAULT_ARCHIVE_DIR}")
+        elif args.archive:
+            logging.info(f"Archiving fetched pages to: {args.archive}")
+        if args.http_cache and not args.replay:
+            logging.info(f"Sending conditional requests from HTTP cache: {args.http_cache}")
+        if args.seen_index:
+            logging.info(f"Skipping articles already in seen-doc index: {args.seen_index}")
+        if title_filter is not None:
+            logging.info(f"Only fetching articles whose title matches one of {title_filter.describe()}")
 
-    def save_results(self):
-        """Save results to CSV"""
-        if not self.result_rows:
-            return
-        
-        file_exists = os.path.isfile(self.output_csv)
-        with open(self.output_csv, 'a', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow([
-                    'Conference_ID', 'Title', 'Link', 'Abstract', 'Citation',
-                    'Authors', 'Conference_Name', 'Year', 'Keywords',
-                    'View_Count', 'Page_Count', 'Authors_Map'
-                ])
-            writer.writerows(self.result_rows)
-        self.result_rows.clear()
-        logging.info(f"Saved {len(self.result_rows)} records to {self.output_csv}")
-
-    def parse_article_list(self, html, conference_id):
-        """Parse article list from HTML"""
+    @staticmethod
+    def parse_list_page(html, conference_id, base_url=BASE_URL):
+        """Parse a list page into its articles and the highest page number it links to"""
+        if isinstance(html, bytes):
+            html = html.decode(PAGE_ENCODING, errors='replace')
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'lxml')
         articles = []
+        last_page = None
+        page_link = re.compile(rf'/l/{re.escape(str(conference_id))}/pgn-(\d+)')
+        for a_tag in soup.find_all('a', href=page_link):
+            page = int(page_link.search(a_tag['href']).group(1))
+            last_page = page if last_page is None else max(last_page, page)
+        
         ul = soup.find('ul', id='articleLists')
         if not ul:
-            return articles
+            return articles, last_page
         
         for li in ul.find_all('li'):
             h2 = li.find('h2')
@@ -121,185 +785,472 @@ class CivilicaScraper:
             a_tag = h2.find('a')
             if a_tag and a_tag.get('href'):
                 title = re.sub(r'^\d+\.\s*', '', a_tag.text.strip())
-                link = urljoin('https://civilica.com/', a_tag['href'])
+                link = urljoin(base_url + '/', a_tag['href'])
                 articles.append((conference_id, title, link))
-        return articles
+        return articles, last_page
+
+    @staticmethod
+    def parse_article_list(html, conference_id, base_url=BASE_URL):
+        """Parse article list from HTML"""
+        return CivilicaScraper.parse_list_page(html, conference_id, base_url)[0]
 
     def extract_keywords_from_page(self, html):
-        """Extract keywords from article page using the new method"""
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Locate the container div using class attributes
-        container = soup.find('div', class_=lambda x: x and 'text-color-base' in x and 'pt-2' in x and 'p-4' in x and 'my-4' in x and 'bg-white' in x and 'border' in x and 'rounded' in x)
-        
-        if not container:
-            return None
-        
-        # Exclude the title paragraph and extract keywords from anchor tags
-        keyword_anchors = container.select('div')
-        keywords = [a.get_text(strip=True) for a in keyword_anchors if a.get_text(strip=True)]
-        
-        return ", ".join(keywords) if keywords else None
+        """Extract keywords from article page"""
+        keywords = self.extractor.keywords(self.extractor.parse(html))
+        return keywords if keywords else None
 
     def parse_article_page(self, html):
-        """Parse article details from HTML"""
-        soup = BeautifulSoup(html, 'lxml')
-        
-        # Abstract
-        abstract_div = soup.select_one('div.prose.max-w-none.my-6.text-color-black.text-justify > div')
-        abstract = abstract_div.text.strip() if abstract_div else ''
-        
-        # Citation
-        citation_block = soup.select_one('blockquote.container.mx-auto.mb-8')
-        citation = citation_block.find('p').text.strip() if citation_block else ''
-        
-        # Authors
-        authors_map = {}
-        author_blocks = soup.select('div.my-2.flex.flex-row.items-center')
-        for block in author_blocks:
-            name_tag = block.select_one('div.flex.flex-col > a')
-            place_tag = block.select_one('div.flex.flex-col > p')
-            if name_tag:
-                name = name_tag.text.strip()
-                place = place_tag.text.strip() if place_tag else ''
-                authors_map[name] = place
-        
-        # View count
-        view_count = '0'
-        view_tag = soup.find('span', class_='text-color-muted')
-        if view_tag:
-            view_text = view_tag.text.strip()
-            match = re.search(r'(\d+)', view_text)
-            if match:
-                view_count = match.group(1)
-        
-        # Keywords - using the new method
-        keywords = self.extract_keywords_from_page(html)
-        
-        return {
-            'abstract': abstract,
-            'citation': citation,
-            'authors': ', '.join(authors_map.keys()),
-            'conference': '',
-            'year': '',
-            'keywords': keywords if keywords else '',
-            'view_count': view_count,
-            'page_count': '',
-            'authors_map': authors_map
-        }
+        """Parse article details from raw HTML in a single pass"""
+        return self.extractor.extract(html)
+
+    async def process_article(self, conference_id, title, link):
+        """Fetch and parse an article unless it was already written or is being fetched"""
+        key = doc_id(link) or link
+        # Planned recrawls refetch articles on purpose
+        if self.seen_index is not None and isinstance(key, int) and key in self.seen_index \
+                and link not in (self.recrawl_articles or ()):
+            self.duplicate_count += 1
+            self.frontier.mark_articles_done([link])
+            return None
+        task = self.in_flight_articles.get(key)
+        if task is not None:
+            # Listed by another conference as well: share the first fetch, write one row
+            self.duplicate_count += 1
+            row = await asyncio.shield(task)
+            if row is not None and row[2] != link:
+                self.frontier.mark_articles_done([link])
+            return None
+        task = asyncio.ensure_future(self.fetch_article(conference_id, title, link))
+        self.in_flight_articles[key] = task
+        row = await task
+        if row is None:
+            del self.in_flight_articles[key]
+        return row
 
-    async def process_article(self, session, conference_id, title, link):
+    async def fetch_article(self, conference_id, title, link):
         """Process single article asynchronously"""
+        if conference_id in self.recrawl_new:
+            self.new_conference_requests += 1
+        try:
+            async with self.parse_stage.slot():
+                status, html = await self.fetcher.fetch(link, ARTICLE_REQUIRED, 'article')
+                if status == NOT_MODIFIED:
+                    # Same page as last crawl: its row is already in an earlier output
+                    self.unchanged_count += 1
+                    self.frontier.mark_articles_done([link])
+                    if self.freshness is not None:
+                        self.freshness.observe_article(link, conference_id, title)
+                    return None
+                if status != 200:
+                    raise HttpStatusError(status)
+                row = await self.parse_stage.article_row(conference_id, title, link, html)
+            
+            self.processed_count += 1
+            if self.processed_count % 10 == 0:
+                elapsed = time.time() - self.start_time
+                logging.info(f"Processed {self.processed_count} articles in {elapsed:.2f} seconds "
+                             f"({self.scheduler.in_flight} requests in flight, "
+                             f"{self.parse_stage.queued} pages parsing, rate {self.rate_limiter})")
+            
+            return row
+        except Exception as e:
+            self.metrics.record_error('article', e)
+            logging.error(f"Article failed: {link} - {describe_error(e)}")
+            self.frontier.mark_article_failed(link, describe_error(e))
+            if self.http_cache is not None:
+                # Not cached, so the next fetch is not taken as unchanged
+                self.http_cache.discard(link)
+            return None
+
+    async def process_and_write_article(self, conference_id, title, link):
+        row = await self.process_article(conference_id, title, link)
+        if row:
+            # Blocks while the writer is behind, pausing this fetcher
+            await self.writer.put(row)
+
+    async def process_articles(self, conference_id, articles):
+        """Fetch (title, link) pairs for a conference and stream their rows to the writer"""
+        if self.title_filter is not None:
+            articles, skipped = self.title_filter.select(articles)
+            if skipped:
+                self.frontier.mark_articles_skipped([link for _, link in skipped])
+        if not articles:
+            return
+        tasks = []
+        for title, link in articles:
+            tasks.append(self.process_and_write_article(conference_id, title, link))
+        
+        # Article fetches queue on the scheduler's request slots and
+        # the shared rate limiter rather than all hitting the network at once.
+        await asyncio.gather(*tasks)
+
+    async def list_page(self, conference_id, page):
+        """Fetch one list page and start fetching its articles in the background
+
+        Returns (task fetching the articles or None if the page lists none,
+        last page number linked from the page), or None if the page failed.
+        """
+        url = f'{self.args.base_url}/l/{conference_id}/pgn-{page}/'
+        if conference_id in self.recrawl_new:
+            self.new_conference_requests += 1
         try:
-            async with session.get(link, timeout=REQUEST_TIMEOUT) as response:
-                if response.status != 200:
-                    raise Exception(f"Status {response.status}")
-                html = await response.text()
-                details = self.parse_article_page(html)
-                
-                self.processed_count += 1
-                if self.processed_count % 10 == 0:
-                    elapsed = time.time() - self.start_time
-                    logging.info(f"Processed {self.processed_count} articles in {elapsed:.2f} seconds")
-                
-                return [
-                    conference_id, title, link,
-                    details['abstract'], details['citation'],
-                    details['authors'], details['conference'],
-                    details['year'], details['keywords'],
-                    details['view_count'], details['page_count'],
-                    json.dumps(details['authors_map'], ensure_ascii=False)
-                ]
+            async with self.parse_stage.slot():
+                status, html = await self.fetcher.fetch(url, LIST_REQUIRED, 'list')
+                if status in RETRY_STATUSES:
+                    raise HttpStatusError(status)
+                # Unchanged list pages are still parsed: their articles may have changed
+                if status not in (200, NOT_MODIFIED):
+                    return None, None
+                articles, last_page = await self.parse_stage.list_page(html, conference_id, self.args.base_url)
         except Exception as e:
-            logging.error(f"Article failed: {link} - {str(e)}")
-            self.failed_urls.append({'conference_id': conference_id, 'url': link, 'error': str(e)})
+            self.metrics.record_error('list', e)
+            logging.error(f"Conference page failed: {url} - {describe_error(e)}")
+            self.frontier.mark_page_failed(conference_id, page, url, describe_error(e))
             return None
+        if not articles:
+            return None, last_page
+        pending = self.frontier.add_page(conference_id, page, url, articles)
+        if self.recrawl_lists is not None:
+            # A recrawl listing is for new papers; known ones wait for their turn in the plan
+            known = self.freshness.known(link for _, link in pending) - self.recrawl_articles
+            self.frontier.mark_articles_done(known)
+            pending = [(title, link) for title, link in pending if link not in known]
+        return asyncio.ensure_future(self.process_articles(conference_id, pending)), last_page
 
-    async def process_conference(self, session, conference_id):
-        """Process all articles in a conference"""
-        page = 1
+    async def list_conference(self, conference_id, article_tasks):
+        """Walk a conference's list pages, adding article tasks as pages arrive; False if a page failed"""
+        page = self.frontier.next_page(conference_id)
+        listed = self.frontier.done_pages(conference_id)
+        result = await self.list_page(conference_id, page)
+        if result is None:
+            return False
+        task, last_page = result
+        if task is None:
+            return True
+        article_tasks.append(task)
+        in_flight = task
+        
+        if last_page and last_page > page:
+            # The pagination links give the page count: list the rest at once
+            pages = [p for p in range(page + 1, last_page + 1) if p not in listed]
+            results = await asyncio.gather(*(self.list_page(conference_id, p) for p in pages))
+            article_tasks.extend(r[0] for r in results if r is not None and r[0] is not None)
+            if None in results:
+                return False
+            if any(r[0] is None for r in results):
+                return True
+            page, in_flight = last_page, None
+        
+        # No page count, or the links stopped short: walk on one page at a time
         while True:
-            url = f'https://civilica.com/l/{conference_id}/pgn-{page}/'
-            try:
-                async with session.get(url, timeout=REQUEST_TIMEOUT) as response:
-                    if response.status != 200:
-                        break
-                    html = await response.text()
-                    articles = self.parse_article_list(html, conference_id)
-                    
-                    if not articles:
-                        break
-                    
-                    tasks = []
-                    for _, title, link in articles:
-                        tasks.append(self.process_article(session, conference_id, title, link))
-                        await asyncio.sleep(random.uniform(*REQUEST_DELAY))
-                    
-                    results = await asyncio.gather(*tasks)
-                    for result in results:
-                        if result:
-                            self.result_rows.append(result)
-                    
-                    if len(self.result_rows) >= SAVE_EVERY:
-                        self.save_results()
-                    
-                    page += 1
-            except Exception as e:
-                logging.error(f"Conference page failed: {url} - {str(e)}")
-                self.failed_urls.append({'conference_id': conference_id, 'url': url, 'error': str(e)})
-                break
+            page += 1
+            if page in listed:
+                continue
+            result = await self.list_page(conference_id, page)
+            if result is None:
+                return False
+            task, _ = result
+            if task is None:
+                return True
+            article_tasks.append(task)
+            if in_flight is not None:
+                # Prefetch only one list page ahead of the article fetches
+                await in_flight
+            in_flight = task
+
+    async def process_conference(self, conference_id):
+        """Process all articles in a conference, resuming from the frontier
+
+        Article fetches start as soon as their list page is parsed, while
+        further list pages are still being fetched.
+        """
+        # Articles listed before an interruption whose rows never reached disk
+        article_tasks = [asyncio.ensure_future(
+            self.process_articles(conference_id, self.frontier.pending_articles(conference_id))
+        )]
+        try:
+            complete = True
+            if self.recrawl_lists is None or conference_id in self.recrawl_lists:
+                complete = await self.list_conference(conference_id, article_tasks)
+                if complete and self.freshness is not None:
+                    self.freshness.observe_conference(conference_id, *self.frontier.conference_counts(conference_id))
+            await asyncio.gather(*article_tasks)
+        except asyncio.CancelledError:
+            for task in article_tasks:
+                task.cancel()
+            raise
+        if complete:
+            self.frontier.mark_conference_done(conference_id)
+
+    async def crawl(self):
+        """Work through the frontier, then requeue failed URLs at its end"""
+        for round_number in range(self.args.requeue_rounds + 1):
+            if round_number:
+                # Flush first: queued rows are still pending in the frontier
+                # and would otherwise be fetched again
+                await self.writer.drain()
+                requeued = self.frontier.requeue_failed()
+                if not requeued:
+                    break
+                logging.info(f"Requeued {requeued} failed URLs (round {round_number}/{self.args.requeue_rounds})")
+            
+            queue = asyncio.Queue()
+            for cid in self.frontier.pending_conferences():
+                queue.put_nowait(cid)
+            
+            async def worker():
+                while not queue.empty():
+                    cid = queue.get_nowait()
+                    await self.process_conference(cid)
+            
+            await asyncio.gather(*(worker() for _ in range(self.args.workers)))
+
+    def on_rows_written(self, rows):
+        # Articles only count as done once their rows are on disk
+        self.frontier.mark_articles_done([row[2] for row in rows])
+        if self.http_cache is not None:
+            # Only now may a later fetch of these pages be taken as unchanged
+            self.http_cache.commit([row[2] for row in rows])
+        for row in rows:
+            key = doc_id(row[2]) or row[2]
+            self.in_flight_articles.pop(key, None)
+            if self.seen_index is not None and isinstance(key, int):
+                self.seen_index.add(key)
+            if self.freshness is not None:
+                views = str(row[9]).strip()
+                self.freshness.observe_article(row[2], row[0], row[1], content_hash(row),
+                                               int(views) if views.isdigit() else None)
+        if self.seen_index is not None:
+            self.seen_index.flush()
+
+    def checkpoint(self):
+        """Persist the frontier, flush the page stores and rewrite the failed-URL log"""
+        self.frontier.checkpoint()
+        if self.archive is not None:
+            self.archive.flush()
+        if self.http_cache is not None:
+            self.http_cache.flush()
+        if self.seen_index is not None:
+            self.seen_index.flush()
+        if self.freshness is not None:
+            self.freshness.flush()
+        failed_urls = self.frontier.failed_urls()
+        if failed_urls:
+            with open(self.failed_urls_log, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['conference_id', 'url', 'error'])
+                writer.writeheader()
+                writer.writerows(failed_urls)
+            logging.info(f"Saved {len(failed_urls)} failed URLs to {self.failed_urls_log}")
+        elif os.path.exists(self.failed_urls_log):
+            # An earlier run's failures have all succeeded since
+            os.remove(self.failed_urls_log)
+
+    def interrupt(self, sig, crawl):
+        self.interrupted = sig
+        crawl.cancel()
+
+    def plan_recrawl(self, ids):
+        """Pick what this recrawl fetches, or reload the plan of the interrupted one it resumes"""
+        plan_path = f'{self.frontier_path}.plan.json'
+        if self.frontier.pending_conferences() and os.path.exists(plan_path):
+            with open(plan_path, encoding='utf-8') as f:
+                plan = json.load(f)
+            logging.info(f"Resuming recrawl plan {plan_path}: {plan['stats']}")
+        else:
+            # The last recrawl finished: start a new one from a clean frontier
+            self.frontier.close()
+            for path in (self.frontier_path, self.failed_urls_log):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.frontier = CrawlFrontier(self.frontier_path)
+            to_list, articles, stats = self.freshness.plan(ids, self.args.recrawl_budget)
+            for cid, items in articles.items():
+                self.frontier.add_articles(cid, items)
+            plan = {
+                # Only conferences with something to do; the rest stay untouched
+                'conferences': [cid for cid in ids if cid in articles or cid in to_list],
+                'list': to_list,
+                # Conferences without history come first in to_list
+                'new': to_list[:stats['new_conferences']],
+                'articles': [url for items in articles.values() for _, url in items],
+                'stats': stats,
+            }
+            with open(plan_path, 'w', encoding='utf-8') as f:
+                json.dump(plan, f)
+            logging.info(f'Recrawl plan: {stats}')
+        self.recrawl_lists = set(plan['list'])
+        self.recrawl_articles = set(plan['articles'])
+        self.recrawl_new = set(plan.get('new', ()))
+        return plan['conferences']
 
     async def run(self):
         """Main scraping process"""
         # Load conference IDs
-        df = pd.read_csv(self.args.input)
-        filtered = df[df['keywords'].notna() & (df['keywords'] != '')]
-        filtered[['id', 'keywords']].to_csv(self.args.filtered, index=False)
-        ids = filtered['id'].astype(str).tolist()[self.args.start:self.args.end]
+        ids = filter_conferences(self.args.input, self.args.filtered, self.args.end)[self.args.start:]
         
         logging.info(f'Processing {len(ids)} conferences from index {self.args.start} to {self.args.end}')
         
-        # Create output file with header
-        with open(self.output_csv, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'Conference_ID', 'Title', 'Link', 'Abstract', 'Citation',
-                'Authors', 'Conference_Name', 'Year', 'Keywords',
-                'View_Count', 'Page_Count', 'Authors_Map'
-            ])
-        
-        # Process conferences in parallel
-        async with aiohttp.ClientSession(headers=HEADERS) as session:
-            tasks = [self.process_conference(session, cid) for cid in ids]
-            await asyncio.gather(*tasks)
+        # An HTTP-cached refresh only writes changed articles, so it appends
+        # to the earlier output instead of replacing it
+        refresh = self.args.http_cache and not self.args.replay
+        # A replay is cheap, so it always re-extracts the whole range
+        if self.args.fresh or self.args.replay:
+            for path in (self.frontier_path, self.failed_urls_log):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.frontier = CrawlFrontier(self.frontier_path)
+        if self.args.freshness:
+            self.freshness = FreshnessIndex(self.args.freshness)
+        if self.args.recrawl_budget:
+            # Recrawls add to the output of earlier ones, like a refresh
+            ids = self.plan_recrawl(ids)
+            refresh = True
+        resuming = self.frontier.has_progress()
+        if resuming:
+            logging.info(f'Resuming from {self.frontier_path}: {self.frontier.counts()}')
+        sink = SINKS[self.args.output_format](self.output_path, truncate=not (resuming or refresh))
+        self.writer = OutputWriter(sink, self.args.write_queue, self.args.save_every, self.args.save_interval,
+                                   on_flush=self.on_rows_written, metrics=self.metrics).start()
+        self.frontier.add_conferences(ids)
+        if self.args.replay or self.args.archive:
+            self.archive = PageArchive(self.args.archive or DEFAULT_ARCHIVE_DIR)
+        if self.args.http_cache and not self.args.replay:
+            self.http_cache = HttpCache(self.args.http_cache)
+        if self.args.seen_index:
+            self.seen_index = SeenIndex(self.args.seen_index)
+            logging.info(f'Seen-doc index holds {len(self.seen_index)} doc IDs')
         
-        # Save remaining results
-        self.save_results()
+        # Process conferences with a fixed pool of workers; requests from
+        # all of them share the scheduler's global and per-host limits
+        self.scheduler = CrawlScheduler(self.args.max_requests, self.args.per_host)
+        self.rate_limiter = AdaptiveRateLimiter(self.args.rate, self.args.min_rate, self.args.max_rate)
+        self.parse_stage = ParseStage(self.args.parse_workers, self.args.parse_queue, self.metrics)
+        logging.info(f'Parsing with {self.args.parse_workers or "no"} worker processes')
+        logging.info(f'Transport: {self.transport.describe()}')
+        self.metrics.gauge('requests_in_flight', lambda: self.scheduler.in_flight)
+        self.metrics.gauge('parse_queue_depth', lambda: self.parse_stage.queued)
+        self.metrics.gauge('write_queue_depth', lambda: self.writer.queue.qsize())
+        # The limiter's numeric state; its state name is only logged
+        for key, name in (('rate', 'request_rate'), ('tokens', 'rate_limiter_tokens'),
+                          ('latency_avg', 'rate_limiter_latency_seconds'), ('decreases', 'rate_limiter_decreases')):
+            self.metrics.gauge(name, lambda key=key: self.rate_limiter.snapshot()[key])
+        self.metrics.gauge('articles_parsed', lambda: self.processed_count)
+        self.metrics.gauge('rows_written', lambda: self.writer.written)
+        self.metrics.gauge('connections_opened', lambda: self.connections['opened'])
+        self.metrics.gauge('connections_reused', lambda: self.connections['reused'])
+        if self.title_filter is not None:
+            self.metrics.gauge('articles_skipped_by_title', lambda: self.title_filter.skipped)
+        metrics_server = None
+        if self.args.metrics_port:
+            try:
+                metrics_server = await self.metrics.serve(self.args.metrics_port)
+            except OSError as e:
+                logging.warning(f'Metrics endpoint not started: {describe_error(e)}')
+        snapshots = None
+        if self.args.metrics_json:
+            snapshots = asyncio.ensure_future(
+                self.metrics.write_snapshots(self.args.metrics_json, self.args.metrics_interval))
+        # One pool of keep-alive connections serves every request of the run
+        connector = self.transport.connector(self.args.max_requests, self.args.per_host)
+        async with aiohttp.ClientSession(headers=self.transport.headers(), connector=connector,
+                                         trace_configs=[connection_trace(self.connections)]) as session:
+            if self.args.replay:
+                self.fetcher = ArchiveFetcher(self.archive)
+            else:
+                self.fetcher = HttpFetcher(session, self.transport, self.scheduler, self.rate_limiter,
+                                           self.args.retries, self.metrics, self.http_cache, self.archive)
+            if self.args.browser_fallback:
+                from functools import partial
+                from script import DriverPool, init_driver
+                drivers = DriverPool(self.args.browser_workers,
+                                     partial(init_driver, self.args.driver, True, BROWSER_TIMEOUT))
+                browser = BrowserFetcher(drivers, self.args.browser_workers, self.rate_limiter)
+                self.fetcher = FallbackFetcher(self.fetcher, browser, self.metrics, self.archive)
+                logging.info(f'Pages missing their markup are fetched again with '
+                             f'{self.args.browser_workers} browser session(s)')
+            crawl = asyncio.ensure_future(self.crawl())
+            
+            def stop_crawl(task):
+                # Fetchers would only queue rows for a writer that is gone
+                if not task.cancelled() and task.exception() is not None:
+                    crawl.cancel()
+            self.writer.task.add_done_callback(stop_crawl)
+            # Ctrl-C / SIGTERM stop the crawl; in-flight articles stay pending
+            # in the frontier and the checkpoint below saves everything else
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, self.interrupt, sig, crawl)
+                except (NotImplementedError, RuntimeError):
+                    pass
+            try:
+                await crawl
+            except asyncio.CancelledError:
+                if not self.writer.task.done():
+                    logging.warning('Interrupted, checkpointing progress')
+            finally:
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    try:
+                        loop.remove_signal_handler(sig)
+                    except (NotImplementedError, RuntimeError):
+                        pass
+                self.parse_stage.close()
+                await self.fetcher.close()
+                try:
+                    # Raises the write error that stopped the crawl, after the checkpoint
+                    await self.writer.close()
+                finally:
+                    self.checkpoint()
+                    if snapshots is not None:
+                        snapshots.cancel()
+                        self.metrics.write_snapshot(self.args.metrics_json)
+                    if metrics_server is not None:
+                        await metrics_server.cleanup()
         
-        # Save failed URLs
-        if self.failed_urls:
-            pd.DataFrame(self.failed_urls).to_csv(self.failed_urls_log, index=False)
-            logging.info(f"Saved {len(self.failed_urls)} failed URLs to {self.failed_urls_log}")
+        logging.info(f'Frontier state: {self.frontier.counts()}')
+        self.frontier.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+        if self.seen_index is not None:
+            self.seen_index.close()
+        if self.freshness is not None:
+            self.freshness.close()
         
         elapsed = time.time() - self.start_time
         logging.info(f'Scraping completed in {elapsed:.2f} seconds')
         logging.info(f'Processed {self.processed_count} articles total')
-        logging.info(f'Results saved to {self.output_csv}')
+        if self.http_cache is not None:
+            logging.info(f'Skipped {self.unchanged_count} unchanged articles')
+        if isinstance(self.fetcher, FallbackFetcher):
+            logging.info(f'Fetched {self.fetcher.fallbacks} pages again with the browser')
+        if self.duplicate_count:
+            logging.info(f'Skipped {self.duplicate_count} articles already fetched or listed twice')
+        if self.recrawl_new:
+            logging.info(f'{len(self.recrawl_new)} new conferences took {self.new_conference_requests} requests '
+                         f'outside the recrawl budget of {self.args.recrawl_budget}')
+        if self.title_filter is not None:
+            logging.info(f'Title filter skipped {self.title_filter.skipped} of {self.title_filter.checked} '
+                         f'listed articles ({self.title_filter.skip_ratio():.1%})')
+        logging.info(f'Final request rate: {self.rate_limiter}')
+        logging.info(f"Connections: {self.connections['opened']} opened, {self.connections['reused']} reused")
+        for stage, histogram in self.metrics.latency.items():
+            logging.info(f'{stage} latency: {histogram.snapshot()}')
+        if self.metrics.errors:
+            logging.info('Errors by type: ' + ', '.join(
+                f'{stage}/{kind}: {count}' for (stage, kind), count in sorted(self.metrics.errors.items())))
+        logging.info(f'Results saved to {self.output_path}')
 
-def main():
-    setup_logging()
-    args = parse_arguments()
-    
-    if args.start < 0 or args.end <= args.start:
-        logging.error("Invalid start/end values. End must be greater than start, and start must be >= 0")
-        return
-    
-    scraper = CivilicaScraper(args)
-    
+def run_scraper(scraper):
+    """Run the scraper to completion on a usable event loop"""
     # Handle event loop properly
     try:
         loop = asyncio.get_event_loop()
         if loop.is_running():
+            # Already inside a loop (e.g. a notebook): allow a nested one
+            import nest_asyncio
+            nest_asyncio.apply()
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             loop.run_until_complete(scraper.run())
@@ -313,5 +1264,93 @@ def main():
         else:
             raise
 
+def main():
+    setup_logging()
+    args = parse_arguments()
+    
+    if args.start < 0 or args.end <= args.start:
+        logging.error("Invalid start/end values. End must be greater than start, and start must be >= 0")
+        sys.exit(2)
+    if args.workers < 1 or args.max_requests < 1 or args.per_host < 1:
+        logging.error("--workers, --max-requests and --per-host must all be at least 1")
+        sys.exit(2)
+    if args.output_format == 'parquet' and not PARQUET_AVAILABLE:
+        logging.error("--output-format parquet needs pyarrow: pip install pyarrow")
+        sys.exit(2)
+    if args.browser_workers < 1:
+        logging.error("--browser-workers must be at least 1")
+        sys.exit(2)
+    if args.browser_fallback and args.replay:
+        logging.error("--browser-fallback cannot be combined with --replay")
+        sys.exit(2)
+    if args.metrics_interval <= 0:
+        logging.error("--metrics-interval must be positive")
+        sys.exit(2)
+    if args.save_every < 1 or args.save_interval <= 0 or args.write_queue < 1:
+        logging.error("--save-every and --write-queue must be at least 1 and --save-interval positive")
+        sys.exit(2)
+    if args.parse_workers < 0 or args.parse_queue < 1:
+        logging.error("--parse-workers cannot be negative and --parse-queue must be at least 1")
+        sys.exit(2)
+    if args.retries < 0 or args.requeue_rounds < 0:
+        logging.error("--retries and --requeue-rounds cannot be negative")
+        sys.exit(2)
+    if not 0 < args.min_rate <= args.max_rate:
+        logging.error("Rates must satisfy 0 < --min-rate <= --max-rate")
+        sys.exit(2)
+    
+    if args.recrawl_budget is not None and (args.recrawl_budget < 1 or not args.freshness or args.replay):
+        logging.error("--recrawl-budget must be at least 1, needs --freshness and cannot be combined with --replay")
+        sys.exit(2)
+    
+    if args.replay and not os.path.isdir(args.archive or DEFAULT_ARCHIVE_DIR):
+        logging.error(f"No page archive at {args.archive or DEFAULT_ARCHIVE_DIR} to replay")
+        sys.exit(2)
+    
+    try:
+        transport = TransportConfig.load(
+            args.transport_config,
+            **{name: getattr(args, name) for name in TRANSPORT_DEFAULTS}
+        )
+    except (OSError, ValueError) as e:
+        logging.error(f"Invalid transport settings: {describe_error(e)}")
+        sys.exit(2)
+    
+    title_filter = None
+    if args.title_keywords or args.title_keyword:
+        try:
+            keywords = load_keywords(args.title_keywords) if args.title_keywords else []
+            title_filter = TitleFilter(keywords + args.title_keyword)
+        except (OSError, ValueError) as e:
+            logging.error(f"Invalid title filter: {describe_error(e)}")
+            sys.exit(2)
+    
+    args.base_url = args.base_url.rstrip('/')
+    scraper = CivilicaScraper(args, transport, title_filter)
+    try:
+        run_scraper(scraper)
+        if scraper.interrupted is not None:
+            # A checkpointed but unfinished range: callers such as coordinator.py
+            # must resume it, not count it as done
+            sys.exit(128 + scraper.interrupted)
+    except KeyboardInterrupt:
+        # Platforms without loop signal handlers (Windows) land here
+        logging.warning('Interrupted, checkpointing progress')
+        if scraper.writer is not None:
+            # Rows still queued were never marked done and will be fetched again
+            scraper.writer.sink.close()
+        if scraper.frontier is not None:
+            scraper.checkpoint()
+            scraper.frontier.close()
+        if scraper.archive is not None:
+            scraper.archive.close()
+        if scraper.http_cache is not None:
+            scraper.http_cache.close()
+        if scraper.seen_index is not None:
+            scraper.seen_index.close()
+        if scraper.freshness is not None:
+            scraper.freshness.close()
+        sys.exit(128 + signal.SIGINT)
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Per-conference and per-article change history for freshness-aware recrawls
+
+Every crawl with --freshness records, for each conference listing and
+article it completes, when it was fetched, whether it changed since the
+previous fetch, its page and article counts and its View_Count. From that
+history each URL gets an estimated change rate: observed changes (plus a
+weak prior) over observed time, and for articles the View_Count growth as
+well, since stale view counts are what goes out of date first. Assuming
+changes arrive as a Poisson process, the chance a URL changed since its
+last fetch is 1 - exp(-rate * age). plan() spends a request budget on the
+URLs with the highest chance; due_at() is when that chance reaches
+DUE_PROBABILITY. Conferences without history are listed in full outside
+the budget.
+
+Usage:
+    python cwr.py --start 0 --end 100 --freshness freshness.sqlite
+    python cwr.py --start 0 --end 100 --freshness freshness.sqlite --recrawl-budget 5000
+    python freshness.py freshness.sqlite --top 20
+"""
+import math
+import time
+import sqlite3
+import hashlib
+import argparse
+
+DAY = 86400.0
+PRIOR_CHANGES = 0.5         # a new URL is assumed to change about
+PRIOR_DAYS = 30.0           # once every PRIOR_DAYS / PRIOR_CHANGES days
+VIEWS_PER_REFRESH = 100     # View_Count growth worth one refetch
+VIEW_RATE_SMOOTHING = 0.5   # weight of the newest View_Count growth rate
+DUE_PROBABILITY = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conferences (
+    conference_id TEXT PRIMARY KEY,
+    first_fetch REAL NOT NULL,
+    last_fetch REAL NOT NULL,
+    last_change REAL,
+    checks INTEGER NOT NULL,
+    changes INTEGER NOT NULL,
+    pages INTEGER,
+    articles INTEGER,
+    rate REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    conference_id TEXT NOT NULL,
+    title TEXT,
+    first_fetch REAL NOT NULL,
+    last_fetch REAL NOT NULL,
+    last_change REAL,
+    checks INTEGER NOT NULL,
+    changes INTEGER NOT NULL,
+    content_hash TEXT,
+    view_count INTEGER,
+    view_rate REAL NOT NULL DEFAULT 0,
+    rate REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_by_conference ON articles (conference_id);
+"""
+
+def content_hash(row):
+    """Hash of an output row's fields except View_Count, which changes with every visit"""
+    fields = [str(value) for i, value in enumerate(row) if i != 9]
+    return hashlib.blake2b('\x1f'.join(fields).encode('utf-8'), digest_size=16).hexdigest()
+
+def change_rate(changes, first_fetch, last_fetch):
+    """Estimated changes per day: observed changes over observed days, with a prior"""
+    return (changes + PRIOR_CHANGES) / ((last_fetch - first_fetch) / DAY + PRIOR_DAYS)
+
+def change_probability(rate, last_fetch, now):
+    return 1 - math.exp(-rate * max(0.0, now - last_fetch) / DAY)
+
+def due_at(rate, last_fetch):
+    """Time at which the change probability reaches DUE_PROBABILITY"""
+    return last_fetch + -math.log(1 - DUE_PROBABILITY) / rate * DAY
+
+class FreshnessIndex:
+    """SQLite history of conference listings and articles, and the recrawl planner
+
+    Every observation is committed at once, so crawler processes sharing
+    the history never wait on each other's write lock for long.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def observe_conference(self, conference_id, pages, articles, now=None):
+        """Record a complete listing; a different page or article count is a change"""
+        now = now or time.time()
+        row = self.conn.execute(
+            'SELECT first_fetch, checks, changes, pages, articles, last_change FROM conferences '
+            'WHERE conference_id = ?', (conference_id,)
+        ).fetchone()
+        if row is None:
+            first_fetch, checks, changes, last_change = now, 1, 0, None
+        else:
+            first_fetch, checks, changes, old_pages, old_articles, last_change = row
+            checks += 1
+            if (pages, articles) != (old_pages, old_articles):
+                changes += 1
+                last_change = now
+        self.conn.execute(
+            'INSERT OR REPLACE INTO conferences (conference_id, first_fetch, last_fetch, last_change, checks, '
+            'changes, pages, articles, rate) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (conference_id, first_fetch, now, last_change, checks, changes, pages, articles,
+             change_rate(changes, first_fetch, now))
+        )
+        self.conn.commit()
+
+    def observe_article(self, url, conference_id, title, digest=None, view_count=None, now=None):
+        """Record an article fetch; digest None means the page came back unchanged (304)"""
+        now = now or time.time()
+        row = self.conn.execute(
+            'SELECT first_fetch, last_fetch, last_change, checks, changes, content_hash, view_count, view_rate '
+            'FROM articles WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            first_fetch, last_change, checks, changes, view_rate = now, None, 1, 0, 0.0
+        else:
+            first_fetch, last_fetch, last_change, checks, changes, old_digest, old_views, view_rate = row
+            checks += 1
+            if digest is None:
+                digest, view_count = old_digest, old_views
+            elif digest != old_digest:
+                changes += 1
+                last_change = now
+            if view_count is not None and old_views is not None and now > last_fetch:
+                growth = max(0, view_count - old_views) / ((now - last_fetch) / DAY)
+                view_rate = VIEW_RATE_SMOOTHING * growth + (1 - VIEW_RATE_SMOOTHING) * view_rate
+        rate = change_rate(changes, first_fetch, now) + view_rate / VIEWS_PER_REFRESH
+        self.conn.execute(
+            'INSERT OR REPLACE INTO articles (url, conference_id, title, first_fetch, last_fetch, last_change, '
+            'checks, changes, content_hash, view_count, view_rate, rate) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (url, conference_id, title, first_fetch, now, last_change, checks, changes, digest, view_count,
+             view_rate, rate)
+        )
+        self.conn.commit()
+
+    def known(self, urls):
+        """The urls that already have history"""
+        known = set()
+        urls = list(urls)
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            rows = self.conn.execute(
+                f'SELECT url FROM articles WHERE url IN ({",".join("?" * len(chunk))})', chunk)
+            known.update(row[0] for row in rows)
+        return known
+
+    def plan(self, conference_ids, budget, now=None):
+        """Spend budget requests on the most likely changed listings and articles of conference_ids
+
+        Listing a conference costs its known page count. Conferences without
+        history are always listed and come first in the list; they are not
+        charged to the budget, since their page and article counts are only
+        known once they are listed, so the crawler reports what they used.
+        Returns (conference IDs to list, {conference ID: [(title, url), ...]}
+        articles to refetch, stats).
+        """
+        now = now or time.time()
+        self.flush()
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS scope (conference_id TEXT PRIMARY KEY)')
+        self.conn.execute('DELETE FROM scope')
+        self.conn.executemany('INSERT OR IGNORE INTO scope VALUES (?)', ((cid,) for cid in conference_ids))
+        known = {cid for (cid,) in self.conn.execute(
+            'SELECT conference_id FROM conferences JOIN scope USING (conference_id)')}
+        to_list = [cid for cid in conference_ids if cid not in known]
+        spent = 0
+        # rate * age orders candidates exactly like their change probability
+        candidates = self.conn.execute(
+            "SELECT 'list', conference_id, NULL, NULL, rate, last_fetch, coalesce(pages, 1), "
+            'rate * (:now - last_fetch) AS priority FROM conferences JOIN scope USING (conference_id) '
+            "UNION ALL SELECT 'article', conference_id, title, url, rate, last_fetch, 1, "
+            'rate * (:now - last_fetch) FROM articles JOIN scope USING (conference_id) '
+            'ORDER BY priority DESC', {'now': now}
+        )
+        articles = {}
+        lowest = None
+        for kind, cid, title, url, rate, last_fetch, cost, _ in candidates:
+            if spent >= budget:
+                break
+            if spent + cost > budget:
+                continue
+            spent += cost
+            lowest = change_probability(rate, last_fetch, now)
+            if kind == 'list':
+                to_list.append(cid)
+            else:
+                articles.setdefault(cid, []).append((title, url))
+        threshold = -math.log(1 - DUE_PROBABILITY) * DAY
+        due = sum(self.conn.execute(
+            f'SELECT COUNT(*) FROM {table} JOIN scope USING (conference_id) WHERE rate * (? - last_fetch) >= ?',
+            (now, threshold)
+        ).fetchone()[0] for table in ('conferences', 'articles'))
+        stats = {
+            'new_conferences': len(to_list) - sum(1 for cid in to_list if cid in known),
+            'listings': sum(1 for cid in to_list if cid in known),
+            'articles': sum(len(items) for items in articles.values()),
+            'requests': spent,
+            'due': due,
+            'lowest_probability': round(lowest, 4) if lowest is not None else None,
+        }
+        return to_list, articles, stats
+
+    def flush(self):
+        self.conn.commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def most_likely_changed(self, limit, now=None):
+        """(kind, key, change probability, due time) of the limit URLs most likely to have changed"""
+        now = now or time.time()
+        rows = self.conn.execute(
+            "SELECT 'conference', conference_id, rate, last_fetch, rate * (:now - last_fetch) AS priority "
+            "FROM conferences UNION ALL SELECT 'article', url, rate, last_fetch, rate * (:now - last_fetch) "
+            'FROM articles ORDER BY priority DESC LIMIT :limit', {'now': now, 'limit': limit}
+        )
+        return [(kind, key, change_probability(rate, last_fetch, now), due_at(rate, last_fetch))
+                for kind, key, rate, last_fetch, _ in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the listings and articles most likely to have changed')
+    parser.add_argument('path', help='Freshness database written by cwr.py --freshness')
+    parser.add_argument('--top', type=int, default=20, help='Rows to show (default: 20)')
+    args = parser.parse_args()
+    index = FreshnessIndex(args.path)
+    try:
+        for kind, key, probability, due in index.most_likely_changed(args.top):
+            print(f"{probability:6.1%}  due {time.strftime('%Y-%m-%d %H:%M', time.localtime(due))}  {kind:10} {key}")
+    finally:
+        index.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""On-disk crawl frontier so interrupted cwr.py runs can resume where they stopped"""
+import sqlite3
+import time
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+# Articles the title filter left out; never fetched or requeued
+SKIPPED = 'skipped'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conferences (
+    conference_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    next_page INTEGER NOT NULL DEFAULT 1,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    conference_id TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    conference_id TEXT NOT NULL,
+    title TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS articles_by_conference ON articles (conference_id, status);
+"""
+
+class CrawlFrontier:
+    """SQLite-backed record of every conference, list page and article URL
+
+    Conferences remember the first list page not yet listed; pages listed
+    out of order after it are skipped on resume. An article only moves
+    to 'done' once its row has been written to the output CSV, so anything
+    lost from memory on a crash is fetched again on the next run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def has_progress(self):
+        """True if a previous run already recorded conferences here"""
+        return self.conn.execute('SELECT 1 FROM conferences LIMIT 1').fetchone() is not None
+
+    def add_conferences(self, conference_ids):
+        """Register conference IDs in crawl order; known IDs keep their state"""
+        with self.conn:
+            offset = self.conn.execute('SELECT COUNT(*) FROM conferences').fetchone()[0]
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO conferences (conference_id, position, updated) VALUES (?, ?, ?)',
+                [(cid, offset + i, time.time()) for i, cid in enumerate(conference_ids)]
+            )
+
+    def pending_conferences(self):
+        rows = self.conn.execute(
+            'SELECT conference_id FROM conferences WHERE status = ? ORDER BY position', (PENDING,)
+        )
+        return [row[0] for row in rows]
+
+    def next_page(self, conference_id):
+        row = self.conn.execute(
+            'SELECT next_page FROM conferences WHERE conference_id = ?', (conference_id,)
+        ).fetchone()
+        return row[0] if row else 1
+
+    def done_pages(self, conference_id):
+        rows = self.conn.execute(
+            'SELECT page FROM pages WHERE conference_id = ? AND status = ?', (conference_id, DONE)
+        )
+        return {row[0] for row in rows}
+
+    def pending_articles(self, conference_id):
+        """(title, url) pairs discovered for a conference but not yet saved"""
+        rows = self.conn.execute(
+            'SELECT title, url FROM articles WHERE conference_id = ? AND status = ? ORDER BY rowid',
+            (conference_id, PENDING)
+        )
+        return rows.fetchall()
+
+    def add_articles(self, conference_id, articles):
+        """Queue (title, url) pairs of a conference without listing its pages"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO articles (url, conference_id, title, updated) VALUES (?, ?, ?, ?)',
+                [(link, conference_id, title, now) for title, link in articles]
+            )
+
+    def conference_counts(self, conference_id):
+        """(highest listed page, articles listed) for a conference"""
+        pages = self.conn.execute(
+            'SELECT MAX(page) FROM pages WHERE conference_id = ? AND status = ?', (conference_id, DONE)
+        ).fetchone()[0]
+        articles = self.conn.execute(
+            'SELECT COUNT(*) FROM articles WHERE conference_id = ?', (conference_id,)
+        ).fetchone()[0]
+        return pages or 0, articles
+
+    def add_page(self, conference_id, page, url, articles):
+        """Record a parsed list page and its articles; return the (title, url) pairs still to fetch"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO articles (url, conference_id, title, updated) VALUES (?, ?, ?, ?)',
+                [(link, conference_id, title, now) for _, title, link in articles]
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, conference_id, page, status, updated) VALUES (?, ?, ?, ?, ?)',
+                (url, conference_id, page, DONE, now)
+            )
+            # List pages can finish out of order; next_page only moves past a
+            # contiguous run of listed pages
+            next_page = self.next_page(conference_id)
+            listed = self.done_pages(conference_id)
+            while next_page in listed:
+                next_page += 1
+            self.conn.execute(
+                'UPDATE conferences SET next_page = ?, updated = ? WHERE conference_id = ?',
+                (next_page, now, conference_id)
+            )
+        links = [link for _, _, link in articles]
+        placeholders = ','.join('?' * len(links))
+        rows = self.conn.execute(
+            f'SELECT title, url FROM articles WHERE status = ? AND url IN ({placeholders}) ORDER BY rowid',
+            (PENDING, *links)
+        )
+        return rows.fetchall()
+
+    def mark_articles_done(self, urls):
+        with self.conn:
+            now = time.time()
+            self.conn.executemany(
+                'UPDATE articles SET status = ?, error = NULL, updated = ? WHERE url = ?',
+                [(DONE, now, url) for url in urls]
+            )
+
+    def mark_articles_skipped(self, urls):
+        with self.conn:
+            now = time.time()
+            self.conn.executemany(
+                'UPDATE articles SET status = ?, error = NULL, updated = ? WHERE url = ?',
+                [(SKIPPED, now, url) for url in urls]
+            )
+
+    def mark_article_failed(self, url, error):
+        with self.conn:
+            self.conn.execute(
+                'UPDATE articles SET status = ?, error = ?, updated = ? WHERE url = ?',
+                (FAILED, error, time.time(), url)
+            )
+
+    def mark_page_failed(self, conference_id, page, url, error):
+        """A list page failed, so the rest of its conference cannot be discovered"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, conference_id, page, status, error, updated) VALUES (?, ?, ?, ?, ?, ?)',
+                (url, conference_id, page, FAILED, error, now)
+            )
+            self.conn.execute(
+                'UPDATE conferences SET status = ?, updated = ? WHERE conference_id = ?',
+                (FAILED, now, conference_id)
+            )
+
+    def mark_conference_done(self, conference_id):
+        with self.conn:
+            self.conn.execute(
+                'UPDATE conferences SET status = ?, updated = ? WHERE conference_id = ?',
+                (DONE, time.time(), conference_id)
+            )
+
+    def requeue_failed(self):
+        """Put failed articles and conferences back to pending; return how many URLs moved
+
+        Conferences are pending again if they own a requeued article or a
+        failed list page; listing resumes from their stored next page.
+        """
+        now = time.time()
+        with self.conn:
+            articles = self.conn.execute(
+                'UPDATE articles SET status = ?, updated = ? WHERE status = ?', (PENDING, now, FAILED)
+            ).rowcount
+            pages = self.conn.execute(
+                'UPDATE pages SET status = ?, updated = ? WHERE status = ?', (PENDING, now, FAILED)
+            ).rowcount
+            self.conn.execute(
+                'UPDATE conferences SET status = ?, updated = ? WHERE status != ? AND ('
+                'conference_id IN (SELECT conference_id FROM pages WHERE status = ?) OR '
+                'conference_id IN (SELECT conference_id FROM articles WHERE status = ?))',
+                (PENDING, now, PENDING, PENDING, PENDING)
+            )
+        return articles + pages
+
+    def failed_urls(self):
+        """Failed list pages and articles as dicts ready for the failed-URL log"""
+        rows = self.conn.execute(
+            'SELECT conference_id, url, error FROM pages WHERE status = ? '
+            'UNION ALL SELECT conference_id, url, error FROM articles WHERE status = ?',
+            (FAILED, FAILED)
+        )
+        return [{'conference_id': cid, 'url': url, 'error': error} for cid, url, error in rows]
+
+    def counts(self):
+        """Status counts per table, e.g. {'articles': {'done': 10, 'pending': 2}}"""
+        counts = {}
+        for table in ('conferences', 'pages', 'articles'):
+            rows = self.conn.execute(f'SELECT status, COUNT(*) FROM {table} GROUP BY status')
+            counts[table] = dict(rows.fetchall())
+        return counts
+
+    def checkpoint(self):
+        """Commit and fold the WAL back into the main database file"""
+        self.conn.commit()
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        self.checkpoint()
+        self.conn.close()
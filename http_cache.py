@@ -0,0 +1,111 @@
+"""Persistent HTTP validator cache for conditional recrawls"""
+import time
+import zlib
+import sqlite3
+import hashlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL,
+    body BLOB NOT NULL,
+    fetched REAL NOT NULL,
+    checked REAL NOT NULL
+);
+"""
+
+class HttpCache:
+    """ETag, Last-Modified and body hash of the last 200 response for each URL
+
+    request_headers() turns a cached entry into If-None-Match /
+    If-Modified-Since. The latest body is kept (compressed) so a 304 can
+    still be parsed where the crawler needs its contents, e.g. list pages.
+    Entries stored with stage=True are held in memory until commit(), so
+    the crawler can record an article only once its row is on disk. Every
+    write is committed at once, so several processes can share the cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        # URL -> row waiting for commit()
+        self.staged = {}
+
+    @staticmethod
+    def body_hash(body):
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def request_headers(self, url):
+        """Conditional request headers for url, or None if it was never cached"""
+        row = self.conn.execute('SELECT etag, last_modified FROM responses WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        headers = {}
+        etag, last_modified = row
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers or None
+
+    def body(self, url):
+        row = self.conn.execute('SELECT body FROM responses WHERE url = ?', (url,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def touch(self, url):
+        """Record that url was revalidated (304) just now"""
+        with self.conn:
+            self.conn.execute('UPDATE responses SET checked = ? WHERE url = ?', (time.time(), url))
+
+    def store(self, url, headers, body, stage=False):
+        """Save a 200 response; return False if its body matches the cached one
+
+        With stage, a changed response is only saved by a later commit(url).
+        """
+        digest = self.body_hash(body)
+        now = time.time()
+        row = self.conn.execute('SELECT body_hash FROM responses WHERE url = ?', (url,)).fetchone()
+        if row is not None and row[0] == digest:
+            # Servers without validators still resend identical pages
+            with self.conn:
+                self.conn.execute(
+                    'UPDATE responses SET etag = ?, last_modified = ?, checked = ? WHERE url = ?',
+                    (headers.get('ETag'), headers.get('Last-Modified'), now, url)
+                )
+            self.staged.pop(url, None)
+            return False
+        entry = (url, headers.get('ETag'), headers.get('Last-Modified'), digest, zlib.compress(body, 6), now, now)
+        if stage:
+            self.staged[url] = entry
+        else:
+            self._save([entry])
+        return True
+
+    def _save(self, entries):
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO responses (url, etag, last_modified, body_hash, body, fetched, checked) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', entries
+            )
+
+    def commit(self, urls):
+        """Save the staged responses of urls"""
+        entries = [self.staged.pop(url) for url in urls if url in self.staged]
+        if entries:
+            self._save(entries)
+
+    def discard(self, url):
+        """Drop a staged response, e.g. because its page could not be used"""
+        self.staged.pop(url, None)
+
+    def flush(self):
+        self.conn.commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Run cwr.py against mock_civilica.py profiles and compare crawler settings
+
+Every combination of server profile and --workers value gets a fresh mock
+server and a fresh crawl in a temporary directory. The report shows wall
+time, article throughput, the crawl's failure rate and the server-side
+latency tail.
+
+Usage:
+    python loadtest.py --profiles healthy flaky --workers 2 4 8 --conferences 10
+    python loadtest.py --profiles throttled --workers 4 --crawler-args "--rate 5 --retries 5"
+"""
+import os
+import csv
+import sys
+import json
+import time
+import shlex
+import socket
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+
+from mock_civilica import PROFILES
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRST_CONFERENCE_ID = 100001
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Load-test cwr.py against the local Civilica stand-in')
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=['healthy'],
+                        help='Mock server profiles to test (default: healthy)')
+    parser.add_argument('--workers', nargs='+', type=int, default=[2],
+                        help='cwr.py --workers values to test (default: 2)')
+    parser.add_argument('--conferences', type=int, default=10, help='Conferences per crawl (default: 10)')
+    parser.add_argument('--server-args', type=str, default='',
+                        help='Extra mock_civilica.py flags, e.g. "--error-5xx 0.1 --max-pages 8"')
+    parser.add_argument('--crawler-args', type=str, default='',
+                        help='Extra cwr.py flags, e.g. "--rate 10 --retries 5"')
+    parser.add_argument('--json', type=str, help='Also write the results to this JSON file')
+    return parser.parse_args()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_server(url, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Mock server did not come up at {url}')
+
+def count_rows(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+def run_config(profile, workers, args):
+    """Start a mock server, crawl it once and return the measurements"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, 'mock_civilica.py'), '--port', str(port),
+         '--profile', profile, *shlex.split(args.server_args)],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server(f'{base_url}/_stats')
+        with tempfile.TemporaryDirectory(prefix='civilica-loadtest-') as workdir:
+            input_csv = os.path.join(workdir, 'conferences.csv')
+            with open(input_csv, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['id', 'keywords'])
+                for i in range(args.conferences):
+                    writer.writerow([FIRST_CONFERENCE_ID + i, 'load test'])
+
+            started = time.time()
+            crawl = subprocess.run(
+                [sys.executable, os.path.join(REPO_DIR, 'cwr.py'), '--start', '0', '--end', str(args.conferences),
+                 '--input', input_csv, '--filtered', os.path.join(workdir, 'filtered.csv'),
+                 '--base-url', base_url, '--workers', str(workers), '--fresh', *shlex.split(args.crawler_args)],
+                cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            elapsed = time.time() - started
+
+            suffix = f'0_{args.conferences}.csv'
+            articles = count_rows(os.path.join(workdir, f'civilica_optimized_output_{suffix}'))
+            failed = count_rows(os.path.join(workdir, f'failed_urls_{suffix}'))
+
+        with urllib.request.urlopen(f'{base_url}/_stats', timeout=5) as response:
+            stats = json.load(response)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        'profile': profile,
+        'workers': workers,
+        'exit_code': crawl.returncode,
+        'seconds': round(elapsed, 2),
+        'articles': articles,
+        'articles_per_s': round(articles / elapsed, 2) if elapsed else 0.0,
+        'failed_urls': failed,
+        'failure_rate': round(failed / (articles + failed), 4) if articles + failed else 0.0,
+        'requests': stats['requests'],
+        'statuses': stats['statuses'],
+        'server_max_in_flight': stats['max_in_flight'],
+        'latency_p50': stats['latency_p50'],
+        'latency_p95': stats['latency_p95'],
+        'latency_p99': stats['latency_p99'],
+    }
+
+def main():
+    args = parse_arguments()
+    results = []
+    print(f'{"profile":10} {"workers":>7} {"seconds":>8} {"articles":>8} {"art/s":>7} {"fail %":>7} '
+          f'{"requests":>8} {"p50 s":>7} {"p95 s":>7} {"p99 s":>7}  statuses')
+    for profile in args.profiles:
+        for workers in args.workers:
+            result = run_config(profile, workers, args)
+            results.append(result)
+            print(f'{profile:10} {workers:7} {result["seconds"]:8.2f} {result["articles"]:8} '
+                  f'{result["articles_per_s"]:7.2f} {result["failure_rate"] * 100:7.2f} {result["requests"]:8} '
+                  f'{result["latency_p50"] or 0:7.3f} {result["latency_p95"] or 0:7.3f} '
+                  f'{result["latency_p99"] or 0:7.3f}  {result["statuses"]}', flush=True)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""In-process crawl metrics: stage latency histograms, per-host counters, gauges and error counts
+
+Metrics can be scraped in Prometheus text format from a local HTTP
+endpoint and/or written periodically as a JSON snapshot.
+"""
+import os
+import json
+import time
+import bisect
+import asyncio
+import logging
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = 'civilica'
+
+def error_type(error):
+    """Short class for an exception, e.g. 'TimeoutError' or 'HTTP 503'"""
+    status = getattr(error, 'status', None)
+    if isinstance(status, int):
+        return f'HTTP {status}'
+    return type(error).__name__
+
+def describe_error(error):
+    """Exception type plus message; str() alone is blank for e.g. asyncio.TimeoutError"""
+    message = str(error)
+    name = type(error).__name__
+    return f'{name}: {message}' if message and message != name else name
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the quantile; None if empty or past the last bucket"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.50),
+            'p90': self.quantile(0.90),
+            'p99': self.quantile(0.99),
+        }
+
+class CrawlMetrics:
+    """Counters and histograms updated by the crawler; gauges are read on demand"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.latency = {}
+        self.responses = {}
+        self.bytes = {}
+        self.errors = {}
+        self.gauges = {}
+
+    def observe(self, stage, seconds):
+        histogram = self.latency.get(stage)
+        if histogram is None:
+            histogram = self.latency[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def record_response(self, host, status, size):
+        key = (host, str(status))
+        self.responses[key] = self.responses.get(key, 0) + 1
+        self.bytes[host] = self.bytes.get(host, 0) + size
+
+    def record_error(self, stage, error):
+        key = (stage, error_type(error))
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def gauge(self, name, func):
+        """Register func() as the current value of gauge name"""
+        self.gauges[name] = func
+
+    def _gauge_values(self):
+        values = {}
+        for name, func in self.gauges.items():
+            try:
+                values[name] = func()
+            except Exception:  # a gauge whose component is not up yet
+                values[name] = None
+        return values
+
+    def snapshot(self):
+        return {
+            'time': time.time(),
+            'uptime': round(time.time() - self.started, 3),
+            'latency': {stage: histogram.snapshot() for stage, histogram in self.latency.items()},
+            'responses': [{'host': host, 'status': status, 'count': count}
+                          for (host, status), count in sorted(self.responses.items())],
+            'bytes': dict(sorted(self.bytes.items())),
+            'errors': [{'stage': stage, 'type': kind, 'count': count}
+                       for (stage, kind), count in sorted(self.errors.items())],
+            'gauges': self._gauge_values(),
+        }
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = [f'# TYPE {PREFIX}_stage_latency_seconds histogram']
+        for stage, histogram in sorted(self.latency.items()):
+            for bound, total in histogram.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{PREFIX}_stage_latency_seconds_bucket{_labels(stage=stage, le=le)} {total}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_sum{_labels(stage=stage)} {histogram.sum}')
+            lines.append(f'{PREFIX}_stage_latency_seconds_count{_labels(stage=stage)} {histogram.count}')
+        lines.append(f'# TYPE {PREFIX}_responses_total counter')
+        for (host, status), count in sorted(self.responses.items()):
+            lines.append(f'{PREFIX}_responses_total{_labels(host=host, status=status)} {count}')
+        lines.append(f'# TYPE {PREFIX}_response_bytes_total counter')
+        for host, size in sorted(self.bytes.items()):
+            lines.append(f'{PREFIX}_response_bytes_total{_labels(host=host)} {size}')
+        lines.append(f'# TYPE {PREFIX}_errors_total counter')
+        for (stage, kind), count in sorted(self.errors.items()):
+            lines.append(f'{PREFIX}_errors_total{_labels(stage=stage, type=kind)} {count}')
+        for name, value in self._gauge_values().items():
+            if value is not None:
+                lines.append(f'# TYPE {PREFIX}_{name} gauge')
+                lines.append(f'{PREFIX}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, path):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temporary, path)
+
+    async def write_snapshots(self, path, interval):
+        """Rewrite the JSON snapshot at path every interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.write_snapshot(path)
+            except OSError as e:
+                logging.warning(f'Could not write metrics snapshot {path}: {describe_error(e)}')
+
+    async def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics (Prometheus) and /metrics.json; returns the runner to clean up"""
+        from aiohttp import web
+
+        async def prometheus(request):
+            return web.Response(text=self.prometheus(), content_type='text/plain', charset='utf-8')
+
+        async def snapshot(request):
+            return web.json_response(self.snapshot())
+
+        app = web.Application()
+        app.router.add_get('/metrics', prometheus)
+        app.router.add_get('/metrics.json', snapshot)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logging.info(f'Metrics at http://{host}:{port}/metrics and /metrics.json')
+        return runner
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Local stand-in for civilica.com for load-testing cwr.py without touching the real site
+
+Serves /l/{id}/pgn-N/ list pages and /doc/{id}/ article pages in the
+markup the crawler parses, with configurable latency, 429/5xx rates,
+dropped connections, hung requests and page counts. Statistics about
+everything served are available as JSON at /_stats.
+
+Usage: python mock_civilica.py --port 8765 --profile flaky [--error-5xx 0.1 ...]
+"""
+import time
+import random
+import asyncio
+import argparse
+from aiohttp import web
+
+DEFAULT_PORT = 8765
+ARTICLES_PER_PAGE = 20
+HANG_SECONDS = 120
+
+# Server behaviour presets; individual flags override them
+PROFILES = {
+    'healthy': {'latency_median': 0.08, 'latency_sigma': 0.4},
+    'slow': {'latency_median': 0.6, 'latency_sigma': 0.8},
+    'flaky': {'latency_median': 0.1, 'latency_sigma': 0.6, 'error_5xx': 0.05, 'disconnect': 0.02, 'hang': 0.005},
+    'throttled': {'latency_median': 0.1, 'latency_sigma': 0.5, 'max_concurrent': 4, 'error_429': 0.02},
+}
+DEFAULTS = {
+    'latency_median': 0.08, 'latency_sigma': 0.4, 'error_429': 0.0, 'error_5xx': 0.0,
+    'disconnect': 0.0, 'hang': 0.0, 'max_concurrent': 0, 'min_pages': 1, 'max_pages': 5,
+    'pagination': True, 'cross_list': 0.0, 'client_render': 0.0,
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="fa" dir="rtl"><head><meta charset="utf-8"><title>{title} - سیویلیکا</title>
+<script>window.__NUXT__={{"padding":"{padding}"}}</script></head>
+<body class="font-iranyekan"><header class="sticky top-0 bg-white border-b"><nav>{nav}</nav></header>
+<main class="container mx-auto">{main}</main>
+<footer class="bg-gray-900 text-white"><p>کلیه حقوق این وب سایت متعلق به سیویلیکا می باشد.</p></footer>
+</body></html>
+"""
+LIST_ITEM_TEMPLATE = """<li class="py-4 border-b"><h2 class="text-base font-bold"><a href="/doc/{doc_id}/" class="text-color-base">{number}. {title}</a></h2>
+<p class="text-sm text-color-muted my-1">{venue}</p></li>"""
+ARTICLE_TEMPLATE = """<h1 class="text-2xl font-bold text-color-black my-4">{title}</h1>
+<div class="flex flex-row items-center gap-4 text-sm"><span class="text-color-muted">{views} بازدید</span></div>
+<section class="my-6">{authors}</section>
+<div class="prose max-w-none my-6 text-color-black text-justify"><div>{abstract}</div></div>
+<div class="text-color-base pt-2 p-4 my-4 bg-white border rounded"><p class="font-bold">کلمات کلیدی:</p>{keywords}</div>
+<blockquote class="container mx-auto mb-8"><h3 class="font-bold">نحوه استناد به مقاله:</h3><p>{citation}</p></blockquote>"""
+# Served instead of the content to plain HTTP clients for --client-render pages;
+# a browser (or ?rendered=1) gets the real page
+SHELL_MAIN = '<div id="__nuxt"><div class="animate-pulse h-64 bg-gray-100"></div></div>'
+AUTHOR_TEMPLATE = """<div class="my-2 flex flex-row items-center"><div class="flex flex-col"><a href="/author/{author_id}/">{name}</a><p class="text-xs text-color-muted">{place}</p></div></div>"""
+
+WORDS = ('پژوهش بررسی تاثیر مدیریت دانش سازمان عملکرد کارکنان یادگیری ماشین شبکه عصبی هوش مصنوعی '
+         'توسعه پایدار انرژی تجدیدپذیر ساختمان بتن زلزله تحلیل داده مدل سازی آب خاک کشاورزی '
+         'اقتصاد بازار آموزش روانشناسی سلامت').split()
+NAMES = ('علی رضایی', 'زهرا محمدی', 'محمد حسینی', 'سارا کریمی', 'رضا احمدی', 'مریم موسوی')
+PLACES = ('دانشگاه تهران', 'دانشگاه شیراز', 'دانشگاه صنعتی شریف', 'دانشگاه آزاد اسلامی واحد علوم و تحقیقات')
+NAV = ''.join(f'<a href="/menu/{i}/">{WORDS[i % len(WORDS)]}</a>' for i in range(60))
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+def conference_layout(conference_id, config):
+    """(page count, article count) for a conference, stable across requests"""
+    rng = random.Random(f'conference-{conference_id}')
+    pages = rng.randint(config['min_pages'], config['max_pages'])
+    articles = (pages - 1) * ARTICLES_PER_PAGE + rng.randint(1, ARTICLES_PER_PAGE)
+    return pages, articles
+
+def render_list_page(conference_id, page, config):
+    pages, articles = conference_layout(conference_id, config)
+    rng = random.Random(f'list-{conference_id}-{page}')
+    items = []
+    if page <= pages:
+        first = (page - 1) * ARTICLES_PER_PAGE
+        for number in range(first + 1, min(first + ARTICLES_PER_PAGE, articles) + 1):
+            # Papers shared with the previous conference reuse its doc IDs
+            owner = conference_id - 1 if rng.random() < config['cross_list'] else conference_id
+            items.append(LIST_ITEM_TEMPLATE.format(
+                doc_id=owner * 1000 + number, number=number,
+                title=words(rng, rng.randint(6, 14)), venue=words(rng, 4)))
+    main = f'<h1>مقالات همایش {conference_id}</h1><ul id="articleLists" class="flex flex-col">{"".join(items)}</ul>'
+    if config['pagination']:
+        main += '<nav class="flex justify-center my-6">' + ''.join(
+            f'<a href="/l/{conference_id}/pgn-{n}/" class="px-3 py-1 border rounded mx-1">{n}</a>'
+            for n in range(1, pages + 1)) + '</nav>'
+    return PAGE_TEMPLATE.format(title=f'لیست مقالات {conference_id}', padding='x' * 4000, nav=NAV, main=main)
+
+def render_article_page(doc_id):
+    rng = random.Random(f'doc-{doc_id}')
+    title = words(rng, rng.randint(6, 14))
+    authors = [(rng.choice(NAMES), rng.choice(PLACES)) for _ in range(rng.randint(1, 6))]
+    main = ARTICLE_TEMPLATE.format(
+        title=title,
+        views=rng.randint(10, 5000),
+        authors=''.join(AUTHOR_TEMPLATE.format(author_id=rng.randint(1, 99999), name=name, place=place)
+                        for name, place in authors),
+        abstract=words(rng, rng.randint(80, 400)),
+        keywords=''.join(f'<div>{words(rng, rng.randint(1, 3))}</div>' for _ in range(rng.randint(3, 8))),
+        citation=f'{"، ".join(name for name, _ in authors)}، {title}، همایش ملی {words(rng, 3)}، 1402',
+    )
+    return PAGE_TEMPLATE.format(title=title, padding='x' * 4000, nav=NAV, main=main)
+
+class MockCivilica:
+    """aiohttp application state: behaviour config plus statistics of what was served"""
+
+    def __init__(self, config):
+        self.config = config
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latencies = []
+        self.statuses = {}
+        self.bytes_sent = 0
+        self.started = time.time()
+
+    def _count(self, outcome, started):
+        self.statuses[outcome] = self.statuses.get(outcome, 0) + 1
+        self.latencies.append(time.monotonic() - started)
+
+    async def handle(self, request):
+        config = self.config
+        started = time.monotonic()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if config['max_concurrent'] and self.in_flight > config['max_concurrent']:
+                self._count('429', started)
+                return web.Response(status=429, headers={'Retry-After': '1'})
+            await asyncio.sleep(random.lognormvariate(0, config['latency_sigma']) * config['latency_median'])
+            roll = random.random()
+            if roll < config['error_429']:
+                self._count('429', started)
+                return web.Response(status=429, headers={'Retry-After': '1'})
+            roll -= config['error_429']
+            if roll < config['error_5xx']:
+                status = random.choice((500, 502, 503, 504))
+                self._count(str(status), started)
+                return web.Response(status=status)
+            roll -= config['error_5xx']
+            if roll < config['hang']:
+                self._count('hang', started)
+                await asyncio.sleep(HANG_SECONDS)
+                return web.Response(status=504)
+
+            kind = request.match_info['kind']
+            item_id = int(request.match_info['item_id'])
+            if (not request.query.get('rendered')
+                    and random.Random(f'shell-{request.path}').random() < config['client_render']):
+                body = PAGE_TEMPLATE.format(title='سیویلیکا', padding='x' * 4000, nav=NAV, main=SHELL_MAIN)
+            elif kind == 'l':
+                body = render_list_page(item_id, int(request.match_info.get('page') or 1), config)
+            else:
+                body = render_article_page(item_id)
+            body = body.encode('utf-8')
+
+            if roll - config['hang'] < config['disconnect']:
+                # Send half the promised body, then drop the connection
+                self._count('disconnect', started)
+                response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+                response.content_length = len(body)
+                await response.prepare(request)
+                await response.write(body[:len(body) // 2])
+                request.transport.close()
+                return response
+
+            self._count('200', started)
+            self.bytes_sent += len(body)
+            return web.Response(body=body, content_type='text/html', charset='utf-8')
+        finally:
+            self.in_flight -= 1
+
+    async def stats(self, request):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 4)
+
+        return web.json_response({
+            'requests': len(latencies),
+            'statuses': self.statuses,
+            'bytes_sent': self.bytes_sent,
+            'max_in_flight': self.max_in_flight,
+            'latency_p50': percentile(0.50),
+            'latency_p95': percentile(0.95),
+            'latency_p99': percentile(0.99),
+            'uptime': round(time.time() - self.started, 3),
+            'config': self.config,
+        })
+
+def build_app(config):
+    mock = MockCivilica(config)
+    app = web.Application()
+    app.router.add_get('/_stats', mock.stats)
+    app.router.add_get(r'/{kind:l}/{item_id:\d+}/pgn-{page:\d+}/', mock.handle)
+    app.router.add_get(r'/{kind:l}/{item_id:\d+}/', mock.handle)
+    app.router.add_get(r'/{kind:doc}/{item_id:\d+}/', mock.handle)
+    return app
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for civilica.com')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='healthy',
+                        help='Behaviour preset; the flags below override it (default: healthy)')
+    parser.add_argument('--latency-median', type=float, help='Median response delay in seconds (lognormal)')
+    parser.add_argument('--latency-sigma', type=float, help='Spread of the lognormal delay')
+    parser.add_argument('--error-429', type=float, help='Fraction of requests answered with 429')
+    parser.add_argument('--error-5xx', type=float, help='Fraction of requests answered with a 5xx')
+    parser.add_argument('--disconnect', type=float, help='Fraction of responses cut off half way')
+    parser.add_argument('--hang', type=float, help=f'Fraction of requests that stall for {HANG_SECONDS}s')
+    parser.add_argument('--max-concurrent', type=int, help='Answer 429 above this many requests in flight (0: no limit)')
+    parser.add_argument('--min-pages', type=int, help='Fewest list pages per conference')
+    parser.add_argument('--max-pages', type=int, help='Most list pages per conference')
+    parser.add_argument('--cross-list', type=float,
+                        help="Fraction of list entries that link to the previous conference's papers")
+    parser.add_argument('--client-render', type=float,
+                        help='Fraction of pages served as an empty shell unless requested with ?rendered=1')
+    parser.add_argument('--no-pagination', dest='pagination', action='store_false', default=None,
+                        help='Leave the page links off list pages, so the page count is unknown')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    config = dict(DEFAULTS, **PROFILES[args.profile])
+    for key in DEFAULTS:
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+    print(f'Mock Civilica on http://{args.host}:{args.port} with {config}', flush=True)
+    web.run_app(build_app(config), host=args.host, port=args.port, print=None)
+
+if __name__ == '__main__':
+    main()
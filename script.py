@@ -14,7 +14,15 @@ from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.edge.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import threading
+import queue
 import re
+from citations import citation_fields as parse_citation_details
+
+BASE_URL = 'https://civilica.com'
+RECYCLE_AFTER = 200         # page loads before a pooled browser is restarted
+# Resources the scraper never looks at; blocking them keeps page loads short
+BLOCKED_URLS = ['*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+                '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico']
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Scrape conference data from Civilica website.')
@@ -39,6 +47,13 @@ def parse_arguments():
                        help='Run browser in headless mode')
     parser.add_argument('--no-parallel', action='store_false', dest='parallel',
                        help='Disable parallel processing')
+    parser.add_argument('--recycle-after', type=int, default=RECYCLE_AFTER,
+                       help='Restart a pooled browser after this many page loads')
+    parser.add_argument('--full-load', action='store_true',
+                       help='Wait for full page loads and load images, fonts and CSS')
+    parser.add_argument('--snapshot', action='store_true',
+                       help="Parse one page_source snapshot per page with cwr.py's extractor instead of "
+                            'querying elements through WebDriver')
     parser.add_argument('--timeout', type=int, default=12,
                        help='Page load timeout in seconds')
     parser.add_argument('--retries', type=int, default=2,
@@ -54,6 +69,7 @@ def parse_arguments():
 
 # Global variables (will be set in main)
 args = None
+driver_pool = None
 failed_urls = []
 failed_urls_lock = threading.Lock()
 result_rows = []
@@ -75,20 +91,113 @@ def save_partial_results():
                     writer.writerow(row)
             result_rows.clear()
 
-def init_driver() -> webdriver.Edge:
+def init_driver(driver_path: str = None, headless: bool = True, timeout: int = 12,
+                lightweight: bool = True) -> webdriver.Edge:
+    """Start an Edge WebDriver; without driver_path Selenium Manager locates one
+
+    A lightweight driver returns once the DOM is ready (eager page load
+    strategy) and never downloads images, fonts or stylesheets.
+    """
     options = Options()
-    if args.headless:
+    if lightweight:
+        options.page_load_strategy = 'eager'
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    if headless:
         options.add_argument('--headless=new')
     options.add_argument('--disable-gpu')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('window-size=1920,1080')
     options.add_argument('user-agent=Mozilla/5.0')
-    service = EdgeService(executable_path=args.driver)
+    service = EdgeService(executable_path=driver_path)
     driver = webdriver.Edge(service=service, options=options)
-    driver.set_page_load_timeout(args.timeout)
+    driver.set_page_load_timeout(timeout)
+    if lightweight:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
     return driver
 
+class DriverPool:
+    """Long-lived WebDriver sessions checked out one task at a time
+
+    Drivers are started on demand, up to size. A driver is checked for a
+    live session before it is handed out, and restarted once it has loaded
+    max_pages pages so a leaking browser never grows without bound.
+    """
+
+    def __init__(self, size: int, factory, max_pages: int = RECYCLE_AFTER):
+        self.size = size
+        self.factory = factory
+        self.max_pages = max_pages
+        self.idle = queue.Queue()
+        self.pages = {}
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def _start(self) -> webdriver.Edge:
+        driver = self.factory()
+        with self.lock:
+            self.pages[driver] = 0
+        return driver
+
+    def _discard(self, driver: webdriver.Edge):
+        with self.lock:
+            self.pages.pop(driver, None)
+            self.started -= 1
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logging.warning('Could not quit browser: %s', e)
+
+    @staticmethod
+    def _healthy(driver: webdriver.Edge) -> bool:
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def acquire(self) -> webdriver.Edge:
+        while True:
+            with self.lock:
+                start = self.idle.empty() and self.started < self.size
+                if start:
+                    self.started += 1
+            if start:
+                try:
+                    return self._start()
+                except Exception:
+                    with self.lock:
+                        self.started -= 1
+                    raise
+            driver = self.idle.get()
+            if driver is None:
+                # A discarded driver freed a slot: start a new one
+                continue
+            if self._healthy(driver):
+                return driver
+            logging.warning('Replacing a browser that stopped responding')
+            self._discard(driver)
+
+    def release(self, driver: webdriver.Edge, pages: int):
+        """Return driver after it loaded pages more pages; worn-out drivers are restarted"""
+        with self.lock:
+            self.pages[driver] = self.pages.get(driver, 0) + pages
+            worn_out = self.pages[driver] >= self.max_pages
+        if worn_out:
+            logging.info('Restarting a browser after %d page loads', self.pages[driver])
+            self._discard(driver)
+            # Wake a thread waiting in acquire(), which can now start a driver
+            self.idle.put(None)
+        else:
+            self.idle.put(driver)
+
+    def close(self):
+        while not self.idle.empty():
+            driver = self.idle.get()
+            if driver is not None:
+                self._discard(driver)
+
 def retry_get(driver: webdriver.Edge, url: str, cid: str = '') -> bool:
     for attempt in range(1, args.retries + 1):
         try:
@@ -113,7 +222,7 @@ def parse_article_list(driver, conference_id):
             a = h2.find_element(By.TAG_NAME, 'a')
             href = a.get_attribute('href')
             title = re.sub(r'^\d+\.\s*', '', a.text.strip())
-            link = urljoin('https://civilica.com/', href)
+            link = urljoin(BASE_URL + '/', href)
             articles.append((conference_id, title, link))
         except NoSuchElementException:
             continue
@@ -133,25 +242,6 @@ def extract_citation(driver):
     except NoSuchElementException:
         return ''
 
-def parse_citation_details(text):
-    details = {'authors': '', 'conference': '', 'year': '', 'keywords': '', 'view_count': '0', 'page_count': ''}
-    if not text:
-        return details
-    m = re.search(r'نوشته شده توسط(.*?)نویسنده مسئول', text)
-    if m: details['authors'] = m.group(1).strip()
-    m = re.search(r'کمیته علمی (.*?) پذیرفته شده است', text)
-    if m: details['conference'] = m.group(1).strip()
-    m = re.search(r'در سال (\d{4})', text)
-    if m: details['year'] = m.group(1)
-    if 'کلمات کلیدی' in text:
-        part = text.split('کلمات کلیدی', 1)[-1]
-        if 'هستند' in part: details['keywords'] = part.split('هستند')[0].strip()
-    m = re.search(r'تاکنون (\d+) بار', text)
-    if m: details['view_count'] = m.group(1)
-    m = re.search(r'با (\d+) صفحه', text)
-    if m: details['page_count'] = m.group(1)
-    return details
-
 def extract_authors_and_places(driver):
     authors_map = {}
     blocks = driver.find_elements(By.CSS_SELECTOR, 'div.my-2.flex.flex-row.items-center')
@@ -167,31 +257,64 @@ def extract_authors_and_places(driver):
         authors_map[name] = place
     return authors_map
 
+def article_row(driver, conf_id, title, link):
+    abstract = extract_abstract(driver)
+    citation = extract_citation(driver)
+    details = parse_citation_details(citation)
+    authors_map = extract_authors_and_places(driver)
+    return [
+        conf_id, title, link,
+        abstract, citation,
+        details['authors'], details['conference'],
+        details['year'], details['keywords'],
+        details['view_count'], details['page_count'],
+        json.dumps(authors_map, ensure_ascii=False)
+    ]
+
+# Snapshot mode: a single page_source round-trip per page, then the same
+# offline lxml extraction cwr.py runs on fetched pages
+
+def snapshot_article_list(driver, conference_id):
+    from cwr import CivilicaScraper
+    return CivilicaScraper.parse_article_list(driver.page_source, conference_id, BASE_URL)
+
+def snapshot_article_row(driver, conf_id, title, link):
+    from cwr import build_article_row
+    return build_article_row(conf_id, title, link, driver.page_source)
+
 def process_conference(conf_id):
-    driver = init_driver()
+    driver = driver_pool.acquire()
+    pages = 0
+    try:
+        pages = crawl_conference(driver, conf_id)
+    finally:
+        # Returned on any error too, or the pool would run out of drivers;
+        # a crashed session is replaced when it is next checked out
+        driver_pool.release(driver, pages)
+
+def crawl_conference(driver, conf_id):
+    """Scrape one conference with driver; returns the number of pages loaded"""
     local_rows = []
+    pages = 0
     page = 1
     while True:
-        url = f'https://civilica.com/l/{conf_id}/pgn-{page}/'
+        url = f'{BASE_URL}/l/{conf_id}/pgn-{page}/'
+        pages += 1
         if not retry_get(driver, url, cid=conf_id):
             break
-        arts = parse_article_list(driver, conf_id)
+        if args.snapshot:
+            arts = snapshot_article_list(driver, conf_id)
+        else:
+            arts = parse_article_list(driver, conf_id)
         if not arts:
             break
         for _, title, link in arts:
+            pages += 1
             if retry_get(driver, link, cid=conf_id):
-                abstract = extract_abstract(driver)
-                citation = extract_citation(driver)
-                details = parse_citation_details(citation)
-                authors_map = extract_authors_and_places(driver)
-                local_rows.append([
-                    conf_id, title, link,
-                    abstract, citation,
-                    details['authors'], details['conference'],
-                    details['year'], details['keywords'],
-                    details['view_count'], details['page_count'],
-                    json.dumps(authors_map, ensure_ascii=False)
-                ])
+                if args.snapshot:
+                    local_rows.append(snapshot_article_row(driver, conf_id, title, link))
+                else:
+                    local_rows.append(article_row(driver, conf_id, title, link))
                 if len(local_rows) >= args.save_every:
                     with result_lock:
                         result_rows.extend(local_rows)
@@ -200,15 +323,15 @@ def process_conference(conf_id):
                 time.sleep(random.uniform(args.min_delay, args.max_delay))
         page += 1
         time.sleep(random.uniform(0.5, 1.0))
-    driver.quit()
 
     if local_rows:
         with result_lock:
             result_rows.extend(local_rows)
         save_partial_results()
+    return pages
 
 def main():
-    global args
+    global args, driver_pool
     args = parse_arguments()
     
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -223,12 +346,21 @@ def main():
     if os.path.exists(args.output):
         os.remove(args.output)
 
-    if args.parallel:
-        with ThreadPoolExecutor(max_workers=args.workers) as pool:
-            pool.map(process_conference, subset)
-    else:
-        for cid in subset:
-            process_conference(cid)
+    # One browser per worker thread, reused across conferences
+    driver_pool = DriverPool(
+        args.workers if args.parallel else 1,
+        lambda: init_driver(args.driver, args.headless, args.timeout, lightweight=not args.full_load),
+        args.recycle_after
+    )
+    try:
+        if args.parallel:
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                pool.map(process_conference, subset)
+        else:
+            for cid in subset:
+                process_conference(cid)
+    finally:
+        driver_pool.close()
 
     # Save failed URLs
     if failed_urls:
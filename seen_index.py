@@ -0,0 +1,74 @@
+"""Persistent bitmap of Civilica doc IDs already written, shared across runs and ranges"""
+import os
+import re
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+DOC_ID = re.compile(r'/doc/(\d+)')
+
+def doc_id(url):
+    """Numeric doc ID of an article URL, or None for anything else"""
+    match = DOC_ID.search(url)
+    return int(match.group(1)) if match else None
+
+class SeenIndex:
+    """One bit per doc ID, so millions of IDs fit in a few hundred KB
+
+    Bits set by this process are OR-ed into the file under an exclusive
+    lock on flush(), which also picks up IDs other crawler processes have
+    flushed since. The file is replaced atomically, so readers never see a
+    partial bitmap. Delete the file to start a new crawl epoch.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.bits = bytearray()
+        self.added = set()
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.bits = bytearray(f.read())
+
+    def __contains__(self, doc_id):
+        index = doc_id >> 3
+        return index < len(self.bits) and bool(self.bits[index] >> (doc_id & 7) & 1)
+
+    def __len__(self):
+        return bin(int.from_bytes(self.bits, 'little')).count('1')
+
+    @staticmethod
+    def _set(bits, doc_id):
+        index = doc_id >> 3
+        if index >= len(bits):
+            bits.extend(bytes(index + 1 - len(bits)))
+        bits[index] |= 1 << (doc_id & 7)
+
+    def add(self, doc_id):
+        self._set(self.bits, doc_id)
+        self.added.add(doc_id)
+
+    def flush(self):
+        if not self.added:
+            return
+        with open(self.path + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            bits = bytearray()
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as f:
+                    bits = bytearray(f.read())
+            for doc_id in self.added:
+                self._set(bits, doc_id)
+            temporary = f'{self.path}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as f:
+                f.write(bits)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.path)
+        self.bits = bits
+        self.added.clear()
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,379 @@
+"""Output sinks and the async writer task that feeds them"""
+import os
+import csv
+import json
+import time
+import shutil
+import asyncio
+import logging
+import importlib.util
+
+from seen_index import doc_id
+
+# pyarrow is slow to import and only needed for --output-format parquet
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+pa = pq = None
+
+OUTPUT_COLUMNS = [
+    'Conference_ID', 'Title', 'Link', 'Abstract', 'Citation',
+    'Authors', 'Conference_Name', 'Year', 'Keywords',
+    'View_Count', 'Page_Count', 'Authors_Map'
+]
+
+class CsvSink:
+    """Append rows to one CSV file kept open for the whole run"""
+
+    def __init__(self, path, truncate=False, columns=OUTPUT_COLUMNS):
+        self.path = path
+        new_file = truncate or not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'w' if new_file else 'a', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(columns)
+            self.file.flush()
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+PARQUET_COMPRESSION = 'zstd'
+PARTITION_COLUMN = 'Conference_ID'
+COMPACTED_FROM = b'compacted_from'  # file metadata key listing the files a compacted one replaced
+
+def parquet_schema():
+    """Typed columns for the Parquet output; Conference_ID lives in the partition path"""
+    return pa.schema([
+        ('Title', pa.string()),
+        ('Link', pa.string()),
+        ('Abstract', pa.string()),
+        ('Citation', pa.string()),
+        ('Authors', pa.string()),
+        ('Conference_Name', pa.string()),
+        ('Year', pa.string()),
+        ('Keywords', pa.string()),
+        ('View_Count', pa.int64()),
+        ('Page_Count', pa.int64()),
+        ('Authors_Map', pa.list_(pa.struct([('name', pa.string()), ('affiliation', pa.string())]))),
+    ])
+
+def _to_int(value):
+    return int(value) if str(value).strip().isdigit() else None
+
+class ParquetSink:
+    """Write rows as zstd Parquet files in a Conference_ID=<id>/ partitioned directory
+
+    Every batch becomes one file per conference it touches, and the file
+    is complete (footer included) once write_rows() returns, so a crash
+    never leaves rows the frontier already counts as done half written.
+    close() then compacts every partition the run wrote to into a single
+    file, so readers do not open one small file per flush. Read the whole
+    directory with pandas.read_parquet(path) or
+    pyarrow.dataset.dataset(path, partitioning='hive').
+    """
+
+    def __init__(self, path, truncate=False):
+        global pa, pq
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError('Parquet output needs pyarrow: pip install pyarrow')
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.path = path
+        self.schema = parquet_schema()
+        if truncate and os.path.isdir(path):
+            for name in os.listdir(path):
+                if name.startswith(f'{PARTITION_COLUMN}='):
+                    shutil.rmtree(os.path.join(path, name))
+        os.makedirs(path, exist_ok=True)
+        # Files from earlier runs keep their names; this run's are unique to it
+        self.prefix = f'part-{int(time.time())}-{os.getpid()}-{os.urandom(3).hex()}'
+        self.files = 0
+        self.partitions = set()
+
+    def write_rows(self, rows):
+        by_conference = {}
+        for row in rows:
+            by_conference.setdefault(str(row[0]), []).append(row)
+        for conference_id, group in by_conference.items():
+            directory = os.path.join(self.path, f'{PARTITION_COLUMN}={conference_id}')
+            os.makedirs(directory, exist_ok=True)
+            self.partitions.add(directory)
+            table = pa.Table.from_pydict({
+                'Title': [row[1] for row in group],
+                'Link': [row[2] for row in group],
+                'Abstract': [row[3] for row in group],
+                'Citation': [row[4] for row in group],
+                'Authors': [row[5] for row in group],
+                'Conference_Name': [row[6] for row in group],
+                'Year': [row[7] for row in group],
+                'Keywords': [row[8] for row in group],
+                'View_Count': [_to_int(row[9]) for row in group],
+                'Page_Count': [_to_int(row[10]) for row in group],
+                'Authors_Map': [
+                    [{'name': name, 'affiliation': affiliation}
+                     for name, affiliation in json.loads(row[11] or '{}').items()]
+                    for row in group
+                ],
+            }, schema=self.schema)
+            self.files += 1
+            filename = f'{self.prefix}-{self.files}.parquet'
+            # Written under a hidden name so dataset readers never see a partial file
+            temporary = os.path.join(directory, f'.{filename}.tmp')
+            pq.write_table(table, temporary, compression=PARQUET_COMPRESSION)
+            os.replace(temporary, os.path.join(directory, filename))
+
+    def compact(self, directory):
+        """Rewrite a partition's files as one; returns the number of files it had
+
+        The compacted file lists its sources in its metadata. If a crash
+        leaves some of them behind, the next compaction deletes them
+        instead of reading their rows twice.
+        """
+        names = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+        for name in list(names):
+            metadata = pq.read_schema(os.path.join(directory, name)).metadata or {}
+            merged = set(json.loads(metadata.get(COMPACTED_FROM, b'[]')))
+            for source in merged & set(names):
+                os.remove(os.path.join(directory, source))
+                names.remove(source)
+        if len(names) < 2:
+            return len(names)
+        table = pa.concat_tables(pq.read_table(os.path.join(directory, name), schema=self.schema)
+                                 for name in names)
+        table = table.replace_schema_metadata({COMPACTED_FROM: json.dumps(names)})
+        self.files += 1
+        filename = f'{self.prefix}-{self.files}.parquet'
+        temporary = os.path.join(directory, f'.{filename}.tmp')
+        pq.write_table(table, temporary, compression=PARQUET_COMPRESSION)
+        os.replace(temporary, os.path.join(directory, filename))
+        for name in names:
+            os.remove(os.path.join(directory, name))
+        return len(names)
+
+    def close(self):
+        compacted = sum(self.compact(directory) for directory in sorted(self.partitions))
+        if compacted:
+            logging.info(f"Compacted {compacted} files into {len(self.partitions)} partitions of {self.path}")
+        self.partitions.clear()
+
+PAPER_COLUMNS = ['Paper_ID'] + [column for column in OUTPUT_COLUMNS if column not in ('Authors', 'Authors_Map')]
+# Written in this order, so names are on disk before the links that use them
+NORMALIZED_TABLES = {
+    'authors': ['Author_ID', 'Name'],
+    'affiliations': ['Affiliation_ID', 'Name'],
+    'paper_authors': ['Paper_ID', 'Position', 'Author_ID', 'Affiliation_ID'],
+    'papers': PAPER_COLUMNS,
+}
+
+class NormalizedSink:
+    """Write rows as a directory of normalized CSV tables with interned author and affiliation names
+
+    papers.csv holds the article columns without Authors and Authors_Map.
+    Every distinct author name and affiliation is written once, to
+    authors.csv and affiliations.csv, under a small integer ID, and
+    paper_authors.csv links each Paper_ID (the article's doc ID, or its
+    link if it has none) to them in author order. Loaded with an index on
+    Author_ID, an author's papers are found without scanning any text.
+    IDs continue across resumed runs.
+    """
+
+    def __init__(self, path, truncate=False):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.tables = {table: CsvSink(os.path.join(path, f'{table}.csv'), truncate, columns)
+                       for table, columns in NORMALIZED_TABLES.items()}
+        self.ids = {'authors': self._load_ids('authors'), 'affiliations': self._load_ids('affiliations')}
+
+    def _load_ids(self, table):
+        ids = {}
+        with open(os.path.join(self.path, f'{table}.csv'), newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for key, name in reader:
+                ids[name] = int(key)
+        return ids
+
+    def intern(self, table, name, new_rows):
+        """Integer ID of name in table; a first sighting adds (ID, name) to new_rows"""
+        ids = self.ids[table]
+        key = ids.get(name)
+        if key is None:
+            key = ids[name] = len(ids) + 1
+            new_rows.append((key, name))
+        return key
+
+    def write_rows(self, rows):
+        batch = {table: [] for table in NORMALIZED_TABLES}
+        for row in rows:
+            paper_id = doc_id(row[2]) or row[2]
+            batch['papers'].append([paper_id, *row[:5], *row[6:11]])
+            for position, (name, affiliation) in enumerate(json.loads(row[11] or '{}').items()):
+                batch['paper_authors'].append((
+                    paper_id, position, self.intern('authors', name, batch['authors']),
+                    self.intern('affiliations', affiliation, batch['affiliations']) if affiliation else ''
+                ))
+        for table, table_rows in batch.items():
+            if table_rows:
+                self.tables[table].write_rows(table_rows)
+
+    def _read(self, path, table):
+        with open(os.path.join(path, f'{table}.csv'), newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            yield from reader
+
+    def merge(self, path):
+        """Append the tables of another normalized directory, interning its names again; returns its paper count"""
+        remap = {}
+        for table in ('authors', 'affiliations'):
+            new_rows = []
+            remap[table] = {key: self.intern(table, name, new_rows) for key, name in self._read(path, table)}
+            self.tables[table].write_rows(new_rows)
+        self.tables['paper_authors'].write_rows(
+            (paper_id, position, remap['authors'][author], remap['affiliations'][affiliation] if affiliation else '')
+            for paper_id, position, author, affiliation in self._read(path, 'paper_authors')
+        )
+        papers = 0
+        for row in self._read(path, 'papers'):
+            self.tables['papers'].writer.writerow(row)
+            papers += 1
+        return papers
+
+    def close(self):
+        for sink in self.tables.values():
+            sink.close()
+
+SINKS = {'csv': CsvSink, 'parquet': ParquetSink, 'normalized': NormalizedSink}
+# Appended to the output name; parquet and normalized output are directories
+EXTENSIONS = {'csv': '.csv', 'parquet': '', 'normalized': ''}
+
+_CLOSE = object()
+_TICK = object()
+
+class OutputWriter:
+    """Single task that owns the output sink; rows reach it through a bounded queue
+
+    Rows are written in batches of flush_rows, or after flush_seconds,
+    whichever comes first. Writes run in a worker thread. While a slow
+    write is in progress the queue fills up and put() blocks, which holds
+    back the fetchers instead of letting rows pile up in memory.
+    on_flush(rows) is called after each batch is on disk, and write times
+    go to metrics.observe('write', seconds) if metrics is given. If a write
+    fails the task stops: the error is logged and raised from every later
+    put(), drain() and close(), so no caller waits on a dead writer.
+    """
+
+    def __init__(self, sink, queue_size, flush_rows, flush_seconds, on_flush=None, metrics=None):
+        self.sink = sink
+        self.queue = asyncio.Queue(queue_size)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.on_flush = on_flush
+        self.metrics = metrics
+        self.written = 0
+        self.task = None
+        self.ticker = None
+
+    def start(self):
+        self.task = asyncio.ensure_future(self._run())
+        self.task.add_done_callback(self._stopped)
+        self.ticker = asyncio.ensure_future(self._tick())
+        return self
+
+    def _stopped(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            self.ticker.cancel()
+            logging.error(f"Output writer failed: {type(task.exception()).__name__}: {task.exception()}")
+
+    def _check(self):
+        if self.task.done():
+            # Raises the write error, if any
+            self.task.result()
+            raise RuntimeError('Output writer is closed')
+
+    async def _wait(self, awaitable):
+        """Await awaitable, raising the writer's error instead if the task stops first"""
+        waiter = asyncio.ensure_future(awaitable)
+        try:
+            await asyncio.wait({waiter, self.task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+        if waiter.done() and not waiter.cancelled():
+            return waiter.result()
+        self._check()
+
+    async def put(self, row):
+        self._check()
+        if not self.queue.full():
+            self.queue.put_nowait(row)
+            return
+        await self._wait(self.queue.put(row))
+
+    async def drain(self):
+        """Wait until every row queued so far is on disk"""
+        self._check()
+        done = asyncio.get_running_loop().create_future()
+        await self._wait(self.queue.put(done))
+        await self._wait(done)
+
+    async def close(self):
+        """Flush what is queued, stop the task and close the sink
+
+        Raises the error that stopped the writer, if any.
+        """
+        self.ticker.cancel()
+        try:
+            if not self.task.done():
+                await self._wait(self.queue.put(_CLOSE))
+            await self.task
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, self.sink.close)
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            # A full queue is already being flushed by size
+            if not self.queue.full():
+                self.queue.put_nowait(_TICK)
+
+    async def _run(self):
+        batch = []
+        started = None
+        while True:
+            item = await self.queue.get()
+            if item is _CLOSE:
+                await self._flush(batch)
+                return
+            if item is _TICK:
+                if batch and time.monotonic() - started >= self.flush_seconds:
+                    await self._flush(batch)
+                    batch = []
+                continue
+            if isinstance(item, asyncio.Future):
+                await self._flush(batch)
+                batch = []
+                item.set_result(None)
+                continue
+            if not batch:
+                started = time.monotonic()
+            batch.append(item)
+            if len(batch) >= self.flush_rows:
+                await self._flush(batch)
+                batch = []
+
+    async def _flush(self, batch):
+        if not batch:
+            return
+        started = time.monotonic()
+        await asyncio.get_running_loop().run_in_executor(None, self.sink.write_rows, batch)
+        if self.metrics is not None:
+            self.metrics.observe('write', time.monotonic() - started)
+        self.written += len(batch)
+        if self.on_flush is not None:
+            self.on_flush(batch)
+        logging.info(f"Saved {len(batch)} records to {self.sink.path} ({self.written} this run)")
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from citations import citation_fields, backfill_frame
+
+PREFIX = 'در صورتی که می خواهید در اثر پژوهشی خود به این مقاله ارجاع دهید، به سادگی می توانید از عبارت زیر استفاده نمایید: '
+
+def test_reference_line_tail():
+    fields = citation_fields(PREFIX + 'سارا کریمی، بررسی همایش ها، همایش ملی بتن، تهران، 1402، https://civilica.com/doc/1/')
+    assert (fields['conference'], fields['year'], fields['page_count']) == ('همایش ملی بتن', '1402', '')
+    # mock_civilica.py lines have no city and no URL
+    fields = citation_fields(PREFIX + 'علی رضایی، عنوان، نهمین کنفرانس ملی آب، 1401')
+    assert (fields['conference'], fields['year']) == ('نهمین کنفرانس ملی آب', '1401')
+
+def test_long_reference_line_without_venue_fails_fast():
+    authors = '، '.join(['نویسنده نمونه'] * 200)
+    line = PREFIX + authors + '، ' + 'عنوان مقاله ' * 500 + '، مجموعه مقالات، تهران، 1402، https://civilica.com/doc/1/'
+    started = time.perf_counter()
+    for _ in range(20):
+        fields = citation_fields(line)
+    # Quadratic backtracking took seconds per line of this length
+    assert time.perf_counter() - started < 1.0
+    assert fields['conference'] == ''
+    assert fields['year'] == '1402'
+
+def test_backfill_frame_uses_both_citation_forms():
+    pd = pytest.importorskip('pandas')
+    frame = pd.DataFrame({
+        'Citation': [
+            PREFIX + 'سارا کریمی، عنوان، همایش ملی X، تهران، 1402، https://civilica.com/doc/1/',
+            'مقاله t نوشته شده توسط a نویسنده مسئول در کمیته علمی کنفرانس Y پذیرفته شده است و در سال 1401 '
+            'منتشر شده است. و با 9 صفحه',
+            '',
+        ],
+        'Conference_Name': ['', '', ''], 'Year': ['', '', ''], 'Page_Count': ['', '', ''],
+    })
+    assert backfill_frame(frame) == 5
+    assert frame['Conference_Name'].tolist() == ['همایش ملی X', 'کنفرانس Y', '']
+    assert frame['Year'].tolist() == ['1402', '1401', '']
+    assert frame['Page_Count'].tolist() == ['', '9', '']
@@ -0,0 +1,43 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cwr import filter_conferences
+
+def write_input(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'title', 'keywords'])
+        writer.writerows(rows)
+
+def test_na_keywords_are_dropped_like_pandas(tmp_path):
+    source = tmp_path / 'conferences.csv'
+    write_input(source, [
+        ('1', 'a', 'بتن، زلزله'),
+        ('2', 'b', ''),
+        ('3', 'c', 'NA'),
+        ('4', 'd', 'nan'),
+        ('5', 'e', 'null'),
+        ('6', 'f', 'N/A'),
+        ('7', 'g', 'None'),
+        ('8', 'h', 'NAN'),
+    ])
+    ids = filter_conferences(str(source), str(tmp_path / 'filtered.csv'))
+    # 'NAN' is not one of pandas' default NA strings
+    assert ids == ['1', '8']
+
+def test_cached_list_from_older_filter_is_rebuilt(tmp_path):
+    source = tmp_path / 'conferences.csv'
+    filtered = tmp_path / 'filtered.csv'
+    write_input(source, [('1', 'a', 'x'), ('2', 'b', 'NA'), ('3', 'c', 'y')])
+    assert filter_conferences(str(source), str(filtered)) == ['1', '3']
+    # A list and stamp written before NA cells were filtered out
+    with open(filtered, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([('id', 'keywords'), ('1', 'x'), ('2', 'NA'), ('3', 'y')])
+    stamp_path = str(filtered) + '.stamp.json'
+    with open(stamp_path) as f:
+        stamp = f.read()
+    with open(stamp_path, 'w') as f:
+        f.write(stamp.replace(', "filter": 2', ''))
+    assert filter_conferences(str(source), str(filtered), end=2) == ['1', '3']
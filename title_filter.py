@@ -0,0 +1,83 @@
+"""Keyword filter on listed article titles, so cwr.py only fetches the articles it needs
+
+Titles and keywords are normalized the same way before matching: Arabic
+yeh, kaf and heh forms become their Persian letters, diacritics and
+tatweel are dropped, ZWNJ and other joiners become spaces, Persian and
+Arabic-Indic digits become ASCII ones and Latin text is case-folded. A
+title matches if any keyword occurs in it as a substring, so a Persian
+stem also matches its plural and suffixed forms.
+
+Every keyword is searched for in a single pass over the title: with an
+Aho-Corasick automaton when pyahocorasick is installed, otherwise with
+one compiled regex alternation (fine for a few hundred keywords).
+
+Keyword files hold one keyword per line; blank lines and lines starting
+with # are ignored.
+"""
+import re
+import importlib.util
+
+AHOCORASICK_AVAILABLE = importlib.util.find_spec('ahocorasick') is not None
+
+_LETTERS = {
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا', 'آ': 'ا',
+    'ؤ': 'و',
+}
+# ZWNJ and no-break spaces separate words; ZWJ and direction marks only decorate them
+_JOINERS = {'\u200c': ' ', '\u200d': '', '\u200e': '', '\u200f': '', '\u00a0': ' '}
+_DIGITS = {chr(zero + i): str(i) for zero in (0x06F0, 0x0660) for i in range(10)}
+# Harakat, superscript alef and tatweel
+_DROPPED = {chr(c): '' for c in [*range(0x064B, 0x0653), 0x0670, 0x0640]}
+NORMALIZE = str.maketrans({**_LETTERS, **_JOINERS, **_DIGITS, **_DROPPED})
+WHITESPACE = re.compile(r'\s+')
+
+def normalize(text):
+    """Text with Persian letter variants, joiners, digits, diacritics and case unified"""
+    return WHITESPACE.sub(' ', (text or '').translate(NORMALIZE).casefold()).strip()
+
+def load_keywords(path):
+    with open(path, encoding='utf-8-sig') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+class TitleFilter:
+    """Multi-keyword matcher over article titles that counts what it keeps and skips"""
+
+    def __init__(self, keywords):
+        self.keywords = sorted({normalize(keyword) for keyword in keywords} - {''})
+        if not self.keywords:
+            raise ValueError('No title keywords to match')
+        if AHOCORASICK_AVAILABLE:
+            import ahocorasick
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._search = lambda text: next(automaton.iter(text), None) is not None
+            self.engine = 'Aho-Corasick'
+        else:
+            pattern = re.compile('|'.join(map(re.escape, self.keywords)))
+            self._search = lambda text: pattern.search(text) is not None
+            self.engine = 'regex'
+        self.checked = 0
+        self.skipped = 0
+
+    def matches(self, title):
+        return self._search(normalize(title))
+
+    def select(self, articles):
+        """Split (title, url) pairs into (matching, skipped) lists"""
+        matching, skipped = [], []
+        for title, link in articles:
+            (matching if self.matches(title) else skipped).append((title, link))
+        self.checked += len(matching) + len(skipped)
+        self.skipped += len(skipped)
+        return matching, skipped
+
+    def skip_ratio(self):
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def describe(self):
+        return f'{len(self.keywords)} title keywords ({self.engine})'
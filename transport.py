@@ -0,0 +1,105 @@
+"""HTTP transport settings for cwr.py: connection pool, timeouts, compression and headers
+
+Settings come from the built-in defaults, then an optional JSON config
+file, then command line flags, each overriding the one before. Example
+config file:
+
+    {"keepalive_timeout": 60, "dns_cache_ttl": 600, "connect_timeout": 3,
+     "read_timeout": 10, "list_timeout": 20, "article_timeout": 30,
+     "user_agent": "Mozilla/5.0 ...", "compression": true}
+
+The connection limits are the crawl's --max-requests and --per-host, so
+the pool never holds more connections than the scheduler lets through.
+"""
+import json
+import importlib.util
+
+import aiohttp
+
+# aiohttp decodes br responses only when a Brotli package is installed
+BROTLI_AVAILABLE = any(importlib.util.find_spec(name) is not None for name in ('brotli', 'brotlicffi'))
+
+DEFAULTS = {
+    'keepalive_timeout': 30.0,  # seconds an idle connection stays in the pool
+    'dns_cache_ttl': 300,       # seconds a resolved address is reused
+    'connect_timeout': 5.0,     # opening a connection, TLS handshake included
+    'read_timeout': 10.0,       # longest gap between two chunks of a response
+    'list_timeout': 15.0,       # whole request for a list page
+    'article_timeout': 20.0,    # whole request for an article page (larger pages)
+    'user_agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                   'Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0'),
+    'compression': True,        # ask for gzip (and br when Brotli is installed)
+}
+
+class TransportConfig:
+    """Resolved transport settings; builds the connector, headers and per-stage timeouts"""
+
+    def __init__(self, **settings):
+        unknown = set(settings) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f'Unknown transport settings: {", ".join(sorted(unknown))}')
+        self.__dict__.update(DEFAULTS, **settings)
+        for name in ('keepalive_timeout', 'connect_timeout', 'read_timeout', 'list_timeout', 'article_timeout'):
+            if not getattr(self, name) > 0:
+                raise ValueError(f'{name} must be positive')
+        if self.dns_cache_ttl < 0:
+            raise ValueError('dns_cache_ttl cannot be negative')
+
+    @classmethod
+    def load(cls, path=None, **overrides):
+        """Defaults, then the JSON file at path, then the overrides that are not None"""
+        settings = {}
+        if path:
+            with open(path, encoding='utf-8') as f:
+                settings = json.load(f)
+            if not isinstance(settings, dict):
+                raise ValueError(f'{path} must hold a JSON object')
+        settings.update((name, value) for name, value in overrides.items() if value is not None)
+        return cls(**settings)
+
+    def connector(self, limit, limit_per_host):
+        """Keep-alive connection pool with a DNS cache, sized to the crawl's request limits"""
+        return aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl or None,
+        )
+
+    def headers(self):
+        headers = {'User-Agent': self.user_agent}
+        if self.compression:
+            headers['Accept-Encoding'] = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+        else:
+            headers['Accept-Encoding'] = 'identity'
+        return headers
+
+    def timeout(self, stage=None):
+        """ClientTimeout for a stage ('list' or 'article'); other requests get the longer of the two"""
+        if stage == 'list':
+            total = self.list_timeout
+        elif stage == 'article':
+            total = self.article_timeout
+        else:
+            total = max(self.list_timeout, self.article_timeout)
+        return aiohttp.ClientTimeout(total=total, sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+
+    def describe(self):
+        encoding = self.headers()['Accept-Encoding']
+        return (f'keep-alive {self.keepalive_timeout:g}s, DNS cache {self.dns_cache_ttl}s, '
+                f'connect {self.connect_timeout:g}s, read {self.read_timeout:g}s, '
+                f'list {self.list_timeout:g}s, article {self.article_timeout:g}s, encoding {encoding}')
+
+def connection_trace(stats):
+    """TraceConfig counting pooled connections into stats['opened'] and stats['reused']"""
+    async def opened(session, context, params):
+        stats['opened'] += 1
+
+    async def reused(session, context, params):
+        stats['reused'] += 1
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_end.append(opened)
+    trace.on_connection_reuseconn.append(reused)
+    return trace